@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Reproducible load test of the API against a local OpenAI stand-in.
+
+Starts the mock OpenAI API and the app (in a subprocess), drives /api/costs,
+/api/projects and /api/login at a fixed concurrency and reports throughput,
+p50/p95/p99 latency, cache hit ratio and peak RSS of the app. Results can be
+saved and compared against a baseline to catch regressions.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from mock_openai import MockOpenAI, SyntheticOrg
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIOS = ("costs", "projects", "login")
+METRICS_TOKEN = "benchmark"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def dashboard_ranges(now=None):
+    """Date ranges offered by the usage dashboard (see src/utils/dateUtils.ts)"""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    month_start = today.replace(day=1)
+    last_month_end = month_start - timedelta(seconds=1)
+    ranges = [
+        (month_start, now),
+        (today, now),
+        (today - timedelta(days=7), now),
+        (today - timedelta(days=30), now),
+        (last_month_end.replace(day=1, hour=0, minute=0, second=0), last_month_end),
+    ]
+    return [(int(start.timestamp()), int(end.timestamp())) for start, end in ranges]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def read_peak_rss_mb(pid):
+    """Peak resident set size of a process (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def scrape_cache_counters(base_url):
+    """Read cache_requests_total counters from /api/metrics"""
+    counters = {}
+    try:
+        text = requests.get(
+            f"{base_url}/api/metrics",
+            headers={"Authorization": f"Bearer {METRICS_TOKEN}"},
+            timeout=10,
+        ).text
+    except requests.exceptions.RequestException:
+        return counters
+    pattern = re.compile(
+        r'^cache_requests_total\{family="(\w+)",result="(\w+)"\} ([0-9.e+]+)$'
+    )
+    for line in text.splitlines():
+        match = pattern.match(line)
+        if match:
+            counters[(match.group(1), match.group(2))] = float(match.group(3))
+    return counters
+
+
+class AppProcess:
+    """The app running in a subprocess, pointed at the mock OpenAI API"""
+
+    def __init__(self, openai_base, workdir):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        env = dict(
+            os.environ,
+            OPENAI_API_BASE=openai_base,
+            OPENAI_API_KEY="benchmark",
+            DATABASE_PATH=os.path.join(workdir, "users.db"),
+            METRICS_TOKEN=METRICS_TOKEN,
+        )
+        self.log = open(os.path.join(workdir, "app.log"), "w")
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(BENCHMARKS_DIR, "serve_app.py"), "--port", str(self.port)],
+            env=env,
+            cwd=workdir,
+            stdout=self.log,
+            stderr=subprocess.STDOUT,
+        )
+
+    def wait_ready(self, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"App exited with code {self.process.returncode}")
+            try:
+                if requests.get(f"{self.base_url}/api/status", timeout=1).ok:
+                    return
+            except requests.exceptions.RequestException:
+                time.sleep(0.1)
+        raise RuntimeError("App did not start in time")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+
+class LoadGenerator:
+    def __init__(self, base_url, mix, seed=42, username="admin", password="admin"):
+        self.base_url = base_url
+        self.mix = mix
+        self.seed = seed
+        self.username = username
+        self.password = password
+        self.ranges = dashboard_ranges()
+        self.token = None
+        self._local = threading.local()
+
+    def login(self, session):
+        return session.post(
+            f"{self.base_url}/api/login",
+            json={"username": self.username, "password": self.password},
+            timeout=60,
+        )
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {self.token}"
+            self._local.session = session
+            self._local.rng = random.Random(f"{self.seed}-{threading.get_ident()}")
+        return session, self._local.rng
+
+    def request(self, scenario):
+        session, rng = self._session()
+        if scenario == "costs":
+            start_time, end_time = rng.choice(self.ranges)
+            params = {
+                "start_time": start_time,
+                "end_time": end_time,
+                "group_by": ["project_id"] + (["line_item"] if rng.random() < 0.3 else []),
+                "bucket_width": "1d",
+                "include_project_names": "true",
+                "format": "columnar",
+            }
+            return session.get(f"{self.base_url}/api/costs", params=params, timeout=120)
+        if scenario == "projects":
+            return session.get(f"{self.base_url}/api/projects", timeout=120)
+        return self.login(session)
+
+    def run(self, total_requests, concurrency):
+        rng = random.Random(self.seed)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        plan = rng.choices(names, weights=weights, k=total_requests)
+
+        response = self.login(requests.Session())
+        response.raise_for_status()
+        self.token = response.json()["token"]
+
+        results = {name: [] for name in names}
+        lock = threading.Lock()
+
+        def execute(scenario):
+            start = time.perf_counter()
+            try:
+                status = self.request(scenario).status_code
+            except requests.exceptions.RequestException:
+                status = "error"
+            elapsed = time.perf_counter() - start
+            with lock:
+                results[scenario].append((elapsed, status))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(execute, plan))
+        return results, time.perf_counter() - started
+
+
+def summarize(samples, wall_time):
+    latencies = sorted(elapsed * 1000 for elapsed, _ in samples)
+    status_counts = {}
+    for _, status in samples:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+    errors = sum(
+        count for status, count in status_counts.items() if not status.startswith("2")
+    )
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "status_counts": status_counts,
+        "throughput_rps": len(samples) / wall_time if wall_time else None,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def compare_with_baseline(report, baseline, max_regression):
+    """Return a list of regressions compared to a baseline report"""
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if previous.get("p95_ms") and current["p95_ms"]:
+            change = current["p95_ms"] / previous["p95_ms"] - 1
+            if change > max_regression:
+                regressions.append(f"{name}: p95 latency +{change:.0%}")
+        if previous.get("throughput_rps") and current["throughput_rps"]:
+            change = 1 - current["throughput_rps"] / previous["throughput_rps"]
+            if change > max_regression:
+                regressions.append(f"{name}: throughput -{change:.0%}")
+    return regressions
+
+
+def format_ms(value):
+    return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_report(report):
+    print(f"{'scenario':<10}{'requests':>9}{'errors':>8}{'req/s':>9}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, stats in list(report["scenarios"].items()) + [("total", report["total"])]:
+        print(
+            f"{name:<10}{stats['requests']:>9}{stats['errors']:>8}"
+            f"{stats['throughput_rps']:>9.1f}{format_ms(stats['p50_ms'])}"
+            f"{format_ms(stats['p95_ms'])}{format_ms(stats['p99_ms'])}"
+        )
+    for family, ratio in report["cache_hit_ratio"].items():
+        print(f"cache hit ratio ({family}): {ratio:.1%}" if ratio is not None
+              else f"cache hit ratio ({family}): -")
+    if report["peak_rss_mb"] is not None:
+        print(f"peak RSS of the app: {report['peak_rss_mb']:.1f} MB")
+    print(f"upstream requests: {report['upstream']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--models", type=int, default=6)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Fraction of 429 responses"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix("costs=70,projects=20,login=10"),
+        help="Scenario weights, e.g. costs=70,projects=20,login=10",
+    )
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed p95/throughput regression against the baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    org = SyntheticOrg(args.projects, args.models, args.days, args.seed)
+    mock = MockOpenAI(
+        org,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    ).start()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = AppProcess(mock.base_url, workdir)
+        try:
+            app.wait_ready()
+            generator = LoadGenerator(app.base_url, args.mix, seed=args.seed)
+            before = scrape_cache_counters(app.base_url)
+            results, wall_time = generator.run(args.requests, args.concurrency)
+            after = scrape_cache_counters(app.base_url)
+            peak_rss_mb = read_peak_rss_mb(app.process.pid)
+        finally:
+            app.stop()
+            mock.stop()
+
+    cache_hit_ratio = {}
+    for family in ("costs", "projects"):
+        hits = after.get((family, "hit"), 0) - before.get((family, "hit"), 0)
+        misses = after.get((family, "miss"), 0) - before.get((family, "miss"), 0)
+        cache_hit_ratio[family] = hits / (hits + misses) if hits + misses else None
+
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("output", "baseline")
+        },
+        "scenarios": {
+            name: summarize(samples, wall_time) for name, samples in results.items()
+        },
+        "total": summarize(
+            [sample for samples in results.values() for sample in samples], wall_time
+        ),
+        "cache_hit_ratio": cache_hit_ratio,
+        "peak_rss_mb": peak_rss_mb,
+        "upstream": dict(mock.stats),
+        "timestamp": datetime.now().isoformat(),
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(report, json.load(f), args.max_regression)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI organization costs and projects endpoints.
+
+Generates a synthetic organization shaped like sample_projects_output.json
+and serves it with configurable latency and rate limiting (429 responses).
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import string
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+SAMPLE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "sample_projects_output.json"
+)
+SECONDS_PER_DAY = 86400
+
+MODEL_FAMILIES = [
+    "gpt-4o",
+    "gpt-4o-mini",
+    "gpt-4.1",
+    "gpt-4.1-mini",
+    "o3",
+    "o4-mini",
+    "text-embedding-3-small",
+    "text-embedding-3-large",
+    "whisper-1",
+    "tts-1",
+    "dall-e-3",
+    "gpt-image-1",
+]
+
+
+def load_sample_shape(path=SAMPLE_PATH):
+    """Read organization id, currency and object names from the sample output"""
+    shape = {
+        "organization_id": "org-benchmark",
+        "currency": "usd",
+        "bucket_object": "bucket",
+        "result_object": "organization.costs.result",
+        "page_object": "page",
+    }
+    try:
+        with open(path) as f:
+            sample = json.load(f)
+        bucket = sample["data"][0]
+        result = bucket["results"][0]
+        shape.update(
+            organization_id=result["organization_id"],
+            currency=result["amount"]["currency"],
+            bucket_object=bucket["object"],
+            result_object=result["object"],
+            page_object=sample["object"],
+        )
+    except (OSError, KeyError, IndexError, ValueError):
+        pass
+    return shape
+
+
+class SyntheticOrg:
+    """Synthetic organization with deterministic daily costs"""
+
+    def __init__(self, projects=50, models=6, days=90, seed=42, archived_ratio=0.1):
+        self.shape = load_sample_shape()
+        rng = random.Random(seed)
+
+        self.end_day = int(time.time()) // SECONDS_PER_DAY + 1
+        self.start_day = self.end_day - days
+
+        alphabet = string.ascii_letters + string.digits
+        self.projects = []
+        for i in range(projects):
+            archived = rng.random() < archived_ratio
+            created_at = (self.start_day - rng.randint(0, 365)) * SECONDS_PER_DAY
+            self.projects.append(
+                {
+                    "id": "proj_" + "".join(rng.choice(alphabet) for _ in range(24)),
+                    "object": "organization.project",
+                    "name": f"{rng.choice(['Team', 'Service', 'App', 'Lab'])} {i:04d}",
+                    "created_at": created_at,
+                    "archived_at": created_at + SECONDS_PER_DAY if archived else None,
+                    "status": "archived" if archived else "active",
+                }
+            )
+
+        self.line_items = []
+        for i in range(models):
+            family = MODEL_FAMILIES[i % len(MODEL_FAMILIES)]
+            suffix = "input" if (i // len(MODEL_FAMILIES)) % 2 == 0 else "output"
+            self.line_items.append(f"{family}, {suffix}")
+
+        # Base daily spend per project and model, heavy tailed like real orgs
+        self.base = [
+            [rng.paretovariate(1.5) * 0.2 for _ in self.line_items]
+            for _ in self.projects
+        ]
+        self.usage = [
+            [rng.random() < 0.5 for _ in self.line_items] for _ in self.projects
+        ]
+
+    def cost(self, day, project, model):
+        """Daily cost with weekly seasonality and deterministic noise"""
+        if not self.usage[project][model]:
+            return 0.0
+        weekly = 1 + 0.3 * math.sin(2 * math.pi * (day % 7) / 7)
+        noise = ((day * 7919 + project * 104729 + model * 1299709) % 1000) / 1000
+        return round(self.base[project][model] * weekly * (0.7 + 0.6 * noise), 6)
+
+    def costs_page(self, start_time, end_time, limit, group_by, project_ids, page):
+        start_day = max(int(start_time) // SECONDS_PER_DAY, self.start_day)
+        end_day = min(math.ceil(int(end_time) / SECONDS_PER_DAY), self.end_day)
+        first = int(page) if page else start_day
+        last = min(first + limit, end_day)
+
+        wanted = set(project_ids) if project_ids else None
+        by_project = "project_id" in group_by
+        by_model = "line_item" in group_by
+        shape = self.shape
+
+        buckets = []
+        for day in range(first, last):
+            totals = {}
+            for p, project in enumerate(self.projects):
+                if wanted is not None and project["id"] not in wanted:
+                    continue
+                for m, line_item in enumerate(self.line_items):
+                    value = self.cost(day, p, m)
+                    if not value:
+                        continue
+                    key = (
+                        project["id"] if by_project else None,
+                        line_item if by_model else None,
+                    )
+                    totals[key] = totals.get(key, 0.0) + value
+            buckets.append(
+                {
+                    "object": shape["bucket_object"],
+                    "start_time": day * SECONDS_PER_DAY,
+                    "end_time": (day + 1) * SECONDS_PER_DAY,
+                    "results": [
+                        {
+                            "object": shape["result_object"],
+                            "amount": {"value": value, "currency": shape["currency"]},
+                            "line_item": line_item,
+                            "project_id": project_id,
+                            "organization_id": shape["organization_id"],
+                        }
+                        for (project_id, line_item), value in totals.items()
+                    ],
+                }
+            )
+
+        has_more = last < end_day
+        return {
+            "object": shape["page_object"],
+            "data": buckets,
+            "has_more": has_more,
+            "next_page": str(last) if has_more else None,
+        }
+
+    def projects_page(self, after, limit, include_archived):
+        projects = [
+            p for p in self.projects if include_archived or p["status"] != "archived"
+        ]
+        ids = [p["id"] for p in projects]
+        start = ids.index(after) + 1 if after in ids else 0
+        data = projects[start : start + limit]
+        return {
+            "object": "list",
+            "data": data,
+            "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": start + limit < len(projects),
+        }
+
+
+class MockOpenAI:
+    """HTTP server serving a SyntheticOrg"""
+
+    def __init__(
+        self,
+        org,
+        host="127.0.0.1",
+        port=0,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        rate_limit=0.0,
+        seed=42,
+    ):
+        self.org = org
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"costs": 0, "projects": 0, "rate_limited": 0}
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random(), self._rng.gauss(0, 1)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                arg = lambda name, default=None: query.get(name, [default])[0]
+
+                if url.path == "/_stats":
+                    return self._send(200, mock.stats)
+
+                if url.path == "/v1/organization/costs":
+                    endpoint = "costs"
+                elif url.path == "/v1/organization/projects":
+                    endpoint = "projects"
+                else:
+                    return self._send(404, {"error": {"message": "Not found"}})
+
+                chance, gauss = mock._random()
+                delay = max(mock.latency_ms + gauss * mock.jitter_ms, 0) / 1000
+                if delay:
+                    time.sleep(delay)
+                mock._count(endpoint)
+
+                if chance < mock.rate_limit:
+                    mock._count("rate_limited")
+                    return self._send(
+                        429,
+                        {
+                            "error": {
+                                "message": "Rate limit reached",
+                                "type": "requests",
+                                "code": "rate_limit_exceeded",
+                            }
+                        },
+                    )
+
+                try:
+                    if endpoint == "costs":
+                        body = mock.org.costs_page(
+                            arg("start_time"),
+                            arg("end_time", str(int(time.time()))),
+                            int(arg("limit", "7")),
+                            query.get("group_by", []),
+                            query.get("project_ids", []),
+                            arg("page"),
+                        )
+                    else:
+                        body = mock.org.projects_page(
+                            arg("after"),
+                            int(arg("limit", "20")),
+                            arg("include_archived", "false") == "true",
+                        )
+                except (TypeError, ValueError) as e:
+                    return self._send(400, {"error": {"message": str(e)}})
+                return self._send(200, body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--models", type=int, default=6)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Fraction of 429 responses"
+    )
+    args = parser.parse_args()
+
+    org = SyntheticOrg(args.projects, args.models, args.days, args.seed)
+    mock = MockOpenAI(
+        org,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    print(f"Mock OpenAI API running at {mock.base_url}")
+    print(f"Use OPENAI_API_BASE={mock.base_url} to point the app at it")
+    try:
+        mock.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Run the Flask app with a threaded WSGI server for benchmarks.
+
+Configuration comes from the environment (OPENAI_API_BASE, OPENAI_API_KEY,
+DATABASE_PATH), so the app can be pointed at the local OpenAI stand-in.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from werkzeug.serving import make_server
+
+import main
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+
+    main.startup()
+    server = make_server(args.host, args.port, main.app, threaded=True)
+    print(f"App running at http://{args.host}:{args.port}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark of the app.
+
+Runs the app in fresh interpreters and measures the time to import it, the
+time until the first request is served (including the deferred startup) and
+the time of every startup phase. Results can be saved and compared against a
+baseline to catch regressions.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+TRIAL = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+imported = time.perf_counter()
+status = main.app.test_client().get("/api/status").status_code
+served = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (served - imported) * 1000,
+    "status": status,
+    "phases": main.startup_timings,
+}}))
+"""
+
+
+def run_trial(workdir):
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="",
+        DATABASE_PATH=os.path.join(workdir, "users.db"),
+    )
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", TRIAL.format(root=os.path.abspath(ROOT_DIR))],
+        env=env,
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result["process_ms"] = wall_ms
+    return result
+
+
+def describe(values):
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed regression of median times against the baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    trials = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # First run creates the database, keep it out of the measurements
+        run_trial(workdir)
+        for _ in range(args.runs):
+            trials.append(run_trial(workdir))
+
+    report = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "metrics": {
+            name: describe([trial[name] for trial in trials])
+            for name in ("import_ms", "first_request_ms", "process_ms")
+        },
+        "phases": {
+            name: describe([trial["phases"].get(name, 0.0) for trial in trials])
+            for name in trials[0]["phases"]
+        },
+    }
+
+    print(f"{'metric':<20}{'median ms':>11}{'min ms':>10}{'max ms':>10}")
+    for section in ("metrics", "phases"):
+        for name, stats in report[section].items():
+            print(
+                f"{name:<20}{stats['median']:>11.1f}{stats['min']:>10.1f}{stats['max']:>10.1f}"
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, stats in report["metrics"].items():
+            previous = baseline.get("metrics", {}).get(name)
+            if previous and previous["median"]:
+                change = stats["median"] / previous["median"] - 1
+                if change > args.max_regression:
+                    regressions.append(f"{name}: median +{change:.0%}")
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
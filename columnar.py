@@ -0,0 +1,104 @@
+COLUMNAR_VERSION = 1
+
+
+class _StringTable:
+    """Dictionary encoding of repeated values"""
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def add(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.values)
+            self._index[value] = index
+            self.values.append(value)
+        return index
+
+
+def encode_costs_columnar(costs_data):
+    """Encode an OpenAI costs response in the compact columnar format.
+
+    Repeated strings (project ids, line items, organization ids, currencies)
+    are stored once in tables, and every result becomes one row of parallel
+    arrays: bucket index, project index, line_item index and amount.
+    Organization and currency columns are omitted when their table has a
+    single value. Project names and archived flags added by the projects
+    index are stored once per project, aligned with the project table.
+    """
+    projects = _StringTable()
+    line_items = _StringTable()
+    organizations = _StringTable()
+    currencies = _StringTable()
+
+    start_times = []
+    end_times = []
+    bucket_column = []
+    project_column = []
+    line_item_column = []
+    organization_column = []
+    currency_column = []
+    amount_column = []
+    project_names = {}
+    project_archived = {}
+
+    bucket_object = "bucket"
+    result_object = "organization.costs.result"
+
+    for bucket_index, bucket in enumerate(costs_data.get("data", [])):
+        start_times.append(bucket.get("start_time"))
+        end_times.append(bucket.get("end_time"))
+        bucket_object = bucket.get("object", bucket_object)
+
+        for result in bucket.get("results", []):
+            amount = result.get("amount") or {}
+            project = projects.add(result.get("project_id"))
+            bucket_column.append(bucket_index)
+            project_column.append(project)
+            line_item_column.append(line_items.add(result.get("line_item")))
+            organization_column.append(organizations.add(result.get("organization_id")))
+            currency_column.append(currencies.add(amount.get("currency")))
+            amount_column.append(amount.get("value"))
+            result_object = result.get("object", result_object)
+
+            if "project_name" in result:
+                project_names[project] = result["project_name"]
+                project_archived[project] = result.get("project_archived")
+
+    tables = {
+        "project_id": projects.values,
+        "line_item": line_items.values,
+        "organization_id": organizations.values,
+        "currency": currencies.values,
+    }
+    if project_names:
+        tables["project_name"] = [
+            project_names.get(i) for i in range(len(projects.values))
+        ]
+        tables["project_archived"] = [
+            project_archived.get(i) for i in range(len(projects.values))
+        ]
+
+    columns = {
+        "bucket": bucket_column,
+        "project": project_column,
+        "line_item": line_item_column,
+        "amount": amount_column,
+    }
+    if len(organizations.values) > 1:
+        columns["organization"] = organization_column
+    if len(currencies.values) > 1:
+        columns["currency"] = currency_column
+
+    return {
+        "object": costs_data.get("object", "page"),
+        "format": "columnar",
+        "version": COLUMNAR_VERSION,
+        "has_more": costs_data.get("has_more", False),
+        "next_page": costs_data.get("next_page"),
+        "objects": {"bucket": bucket_object, "result": result_object},
+        "buckets": {"start_time": start_times, "end_time": end_times},
+        "tables": tables,
+        "columns": columns,
+    }
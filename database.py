@@ -6,13 +6,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-DATABASE_PATH = "users.db"
+
+def get_database_path():
+    """Path of the SQLite database, read at call time so .env values apply"""
+    return os.getenv("DATABASE_PATH", "users.db")
 
 
 def init_database():
     """Initialize the database and create tables"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         # Create users table
@@ -54,7 +57,7 @@ def init_database():
 def create_default_admin():
     """Create default admin user if it doesn't exist"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         # Check if admin user exists
@@ -87,7 +90,7 @@ def create_default_admin():
 def get_user_by_username(username):
     """Get user by username"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         cursor.execute(
@@ -134,7 +137,7 @@ def verify_user_credentials(username, password):
 def get_all_users():
     """Get all users (for admin purposes)"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         cursor.execute(
@@ -169,7 +172,7 @@ def get_all_users():
 def create_user(first_name, last_name, username, password, role="user"):
     """Create a new user"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         # Check if username already exists
@@ -202,7 +205,7 @@ def create_user(first_name, last_name, username, password, role="user"):
 def update_user_password(user_id, new_password):
     """Update user password"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         password_hash = generate_password_hash(new_password)
@@ -233,7 +236,7 @@ def update_user_password(user_id, new_password):
 def delete_user(user_id):
     """Delete a user"""
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
+        conn = sqlite3.connect(get_database_path())
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
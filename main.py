@@ -1,23 +1,56 @@
-from flask import Flask, request, jsonify, send_from_directory
-from flask_cors import CORS
-import requests
+import time
+
+_import_start = time.perf_counter()
+
+from flask import Flask, request, jsonify, send_from_directory, g, Response
+import hmac
+import importlib
 import os
 from datetime import datetime, timedelta
 import logging
+import threading
 from functools import wraps
-from dotenv import load_dotenv
-from flask_caching import Cache
-import jwt
-from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.security import check_password_hash
 from database import (
     init_database,
     verify_user_credentials,
     get_user_by_username,
     update_user_password,
 )
+from projects_index import (
+    ProjectsIndex,
+    ProjectsFetchError,
+    get_project_name,
+    is_project_archived,
+)
+from spend_stats import SpendTracker
+from columnar import encode_costs_columnar
+import metrics
+from profiling import RequestProfiler, PROFILE_MODES, phase
+from query_canon import (
+    CanonicalQueryStats,
+    canonicalize_costs_query,
+    generate_cache_key,
+    raw_query_fingerprint,
+)
+
+
+class LazyModule:
+    """Module proxy that imports the module on first attribute access"""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
 
-# Load environment variables from .env file
-load_dotenv()
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+# Heavy modules are only imported when first used
+requests = LazyModule("requests")
+jwt = LazyModule("jwt")
 
 
 # Configure logging
@@ -26,26 +59,43 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder="build", static_url_path="")
 
-# JWT Configuration
-app.config["SECRET_KEY"] = os.getenv(
-    "SECRET_KEY", "your-secret-key-change-this-in-production"
-)
+# JWT Configuration (SECRET_KEY is read from the environment on startup)
 app.config["JWT_ALGORITHM"] = "HS256"
 app.config["JWT_EXPIRATION_HOURS"] = 24
 
-# Enable CORS for development
-CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
+# Configuration, read from the environment (and .env file) on startup
+OPENAI_API_KEY = None
+OPENAI_ORG_ID = None
 
-# Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-OPENAI_ORG_ID = os.getenv("OPENAI_ORG_ID", None)
-
-# Cache configuration
+# Cache configuration, the cache is created on startup
 app.config["CACHE_TYPE"] = "simple"
 app.config["CACHE_DEFAULT_TIMEOUT"] = 3600  # 1 hour in seconds
-cache = Cache(app)
-
-# OpenAI API endpoints
+cache = None
+
+# Projects index configuration
+app.config["PROJECTS_INDEX_PAGE_SIZE"] = 100
+app.config["PROJECTS_INDEX_REFRESH_INTERVAL"] = 300  # 5 minutes in seconds
+app.config["PROJECTS_INDEX_FULL_SYNC_INTERVAL"] = 3600  # 1 hour in seconds
+app.config["PROJECTS_INDEX_RETRY_BACKOFF"] = 30  # seconds, doubles per failure
+
+# Spend statistics and anomaly detection configuration
+app.config["SPEND_STATS_WINDOW"] = 14  # buckets (days)
+app.config["SPEND_STATS_EWMA_ALPHA"] = 0.3
+app.config["ANOMALY_Z_THRESHOLD"] = 3.0
+app.config["ANOMALY_DOD_THRESHOLD"] = 1.0  # +100% day over day
+app.config["ANOMALY_MIN_AMOUNT"] = 1.0  # ignore buckets below this amount
+app.config["ANOMALY_MIN_HISTORY"] = 3  # buckets required before reporting
+
+# Request profiling configuration
+app.config["PROFILING_CAPACITY"] = 50  # profiles kept in the ring buffer
+app.config["PROFILING_SLOW_REQUEST_MS"] = 5000
+app.config["PROFILING_SAMPLING_INTERVAL_MS"] = 5
+
+# Canonical query statistics configuration
+app.config["CANONICAL_STATS_MAX_KEYS"] = 1000  # canonical keys tracked
+app.config["CANONICAL_STATS_MAX_RAW"] = 256  # raw queries tracked per key
+
+# OpenAI API endpoints (OPENAI_API_BASE is read on startup)
 OPENAI_COSTS_URL = "https://api.openai.com/v1/organization/costs"
 OPENAI_PROJECTS_URL = "https://api.openai.com/v1/organization/projects"
 
@@ -66,19 +116,24 @@ def require_jwt(f):
             return jsonify({"error": "Token is missing"}), 401
 
         try:
-            # Decode token
-            payload = jwt.decode(
-                token,
-                app.config["SECRET_KEY"],
-                algorithms=[app.config["JWT_ALGORITHM"]],
-            )
-            current_user = payload["username"]
-
-            # Check if user exists in database
-            user = get_user_by_username(current_user)
+            with phase("auth"):
+                # Decode token
+                with metrics.JWT_DURATION.time(operation="decode"):
+                    payload = jwt.decode(
+                        token,
+                        app.config["SECRET_KEY"],
+                        algorithms=[app.config["JWT_ALGORITHM"]],
+                    )
+                current_user = payload["username"]
+
+                # Check if user exists in database
+                with metrics.SQLITE_DURATION.time(query="get_user_by_username"):
+                    user = get_user_by_username(current_user)
             if not user:
                 return jsonify({"error": "Invalid token"}), 401
 
+            g.jwt_payload = payload
+
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token has expired"}), 401
         except jwt.InvalidTokenError:
@@ -89,23 +144,70 @@ def require_jwt(f):
     return decorated_function
 
 
-def get_current_user_from_token():
-    """Helper function to get current user from JWT token"""
+def require_admin(f):
+    """Decorator to check the admin role claim, use after require_jwt"""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        payload = g.get("jwt_payload") or {}
+        if payload.get("role") != "admin":
+            return jsonify({"error": "Admin role required"}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def get_token_payload():
+    """Decode the JWT token of the request without checking the database"""
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
         try:
-            payload = jwt.decode(
-                token,
+            return jwt.decode(
+                auth_header.split(" ")[1],
                 app.config["SECRET_KEY"],
                 algorithms=[app.config["JWT_ALGORITHM"]],
             )
-            return get_user_by_username(payload["username"])
+        except jwt.InvalidTokenError:
+            return None
+    return None
+
+
+def get_current_user_from_token():
+    """Helper function to get current user from JWT token"""
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+        try:
+            with metrics.JWT_DURATION.time(operation="decode"):
+                payload = jwt.decode(
+                    token,
+                    app.config["SECRET_KEY"],
+                    algorithms=[app.config["JWT_ALGORITHM"]],
+                )
+            with metrics.SQLITE_DURATION.time(query="get_user_by_username"):
+                return get_user_by_username(payload["username"])
         except:
             return None
     return None
 
 
+def require_metrics_auth(f):
+    """Decorator to accept the METRICS_TOKEN scrape token or a JWT token"""
+    protected = require_jwt(f)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        scrape_token = app.config.get("METRICS_TOKEN")
+        auth_header = request.headers.get("Authorization", "")
+        if scrape_token and hmac.compare_digest(
+            auth_header.encode(), f"Bearer {scrape_token}".encode()
+        ):
+            return f(*args, **kwargs)
+        return protected(*args, **kwargs)
+
+    return decorated_function
+
+
 def require_api_key(f):
     """Decorator to check if OpenAI API key is configured"""
 
@@ -136,14 +238,367 @@ def get_openai_headers():
     return headers
 
 
-def generate_cache_key(endpoint: str, params: dict = None) -> str:
-    """Generate a unique cache key based on endpoint and parameters"""
-    import json
-    import hashlib
+def openai_get(url, endpoint, params, timeout):
+    """GET an OpenAI API endpoint, recording latency and payload size"""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        with phase("upstream"), metrics.UPSTREAM_IN_FLIGHT.track_inprogress(
+            endpoint=endpoint
+        ):
+            response = requests.get(
+                url, headers=get_openai_headers(), params=params, timeout=timeout
+            )
+        status = str(response.status_code)
+        metrics.UPSTREAM_RESPONSE_SIZE.observe(
+            len(response.content), endpoint=endpoint
+        )
+        return response
+    finally:
+        metrics.UPSTREAM_REQUEST_DURATION.observe(
+            time.perf_counter() - start, endpoint=endpoint, status=status
+        )
+
+
+# Cache keys per family, used to attribute evictions of the response cache
+_cache_family_keys = {"costs": set()}
+_cache_family_lock = threading.Lock()
+
+
+def _cache_store():
+    """Entries dict of the response cache, None unless it is a SimpleCache"""
+    if cache is None:
+        return None
+    return getattr(cache.cache, "_cache", None)
+
+
+def _cache_entries():
+    """Number of entries in the response cache (SimpleCache only)"""
+    return len(_cache_store() or ())
+
+
+metrics.CACHE_ENTRIES.set_function(_cache_entries)
+
+
+def cache_get(family, key):
+    """Get a value from the response cache, counting hits and misses"""
+    value = cache.get(key)
+    metrics.CACHE_REQUESTS.inc(family=family, result="hit" if value else "miss")
+    return value
+
+
+def cache_set(family, key, value):
+    """Set a value in the response cache, counting evictions per family"""
+    if _cache_store() is None:
+        cache.set(key, value)
+        return
+
+    size_before = _cache_entries()
+    with _cache_family_lock:
+        keys = _cache_family_keys.setdefault(family, set())
+        is_new = key not in keys
+        keys.add(key)
+    cache.set(key, value)
+
+    # The cache pruned entries if it did not grow as expected
+    if _cache_entries() < size_before + is_new:
+        stored = _cache_store()
+        with _cache_family_lock:
+            for name, keys in _cache_family_keys.items():
+                evicted = {k for k in keys if k not in stored}
+                if evicted:
+                    keys -= evicted
+                    metrics.CACHE_EVICTIONS.inc(len(evicted), family=name)
 
-    key_data = {"endpoint": endpoint, "params": params or {}}
-    key_string = json.dumps(key_data, sort_keys=True)
-    return hashlib.md5(key_string.encode()).hexdigest()
+
+def fetch_projects_page(after=None, limit=100):
+    """Fetch a single page of projects (including archived ones) from OpenAI"""
+    params = {"include_archived": "true", "limit": limit}
+    if after:
+        params["after"] = after
+
+    response = openai_get(OPENAI_PROJECTS_URL, "projects", params, timeout=30)
+    if response.status_code != 200:
+        logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
+        raise ProjectsFetchError(response.status_code, response.text)
+    return response.json()
+
+
+projects_index = ProjectsIndex(
+    fetch_projects_page,
+    page_size=app.config["PROJECTS_INDEX_PAGE_SIZE"],
+    refresh_interval=app.config["PROJECTS_INDEX_REFRESH_INTERVAL"],
+    full_sync_interval=app.config["PROJECTS_INDEX_FULL_SYNC_INTERVAL"],
+    retry_backoff=app.config["PROJECTS_INDEX_RETRY_BACKOFF"],
+    on_evict=lambda count: metrics.PROJECTS_INDEX_DELETIONS.inc(count),
+)
+
+
+request_profiler = RequestProfiler(
+    capacity=app.config["PROFILING_CAPACITY"],
+    slow_threshold_ms=app.config["PROFILING_SLOW_REQUEST_MS"],
+    sampling_interval_ms=app.config["PROFILING_SAMPLING_INTERVAL_MS"],
+)
+
+
+spend_tracker = SpendTracker(
+    window=app.config["SPEND_STATS_WINDOW"],
+    alpha=app.config["SPEND_STATS_EWMA_ALPHA"],
+)
+
+
+canonical_stats = CanonicalQueryStats(
+    max_keys=app.config["CANONICAL_STATS_MAX_KEYS"],
+    max_raw=app.config["CANONICAL_STATS_MAX_RAW"],
+)
+
+
+# --- Startup ---
+#
+# Configuration, CORS, the response cache and the database are initialized
+# on the first request (or explicitly with startup()) instead of at import
+# time, so importing the app stays fast. The projects index is then warmed
+# up in the background; /api/ready reports when everything is warm.
+
+startup_timings = {}  # phase -> milliseconds
+_startup_lock = threading.Lock()
+_started = False
+_database_ready = False
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def _load_config():
+    global OPENAI_API_KEY, OPENAI_ORG_ID, OPENAI_COSTS_URL, OPENAI_PROJECTS_URL
+    from dotenv import load_dotenv
+
+    # Load environment variables from .env file
+    load_dotenv()
+
+    app.config["SECRET_KEY"] = os.getenv(
+        "SECRET_KEY", "your-secret-key-change-this-in-production"
+    )
+    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    OPENAI_ORG_ID = os.getenv("OPENAI_ORG_ID", None)
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+
+    api_base = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1").rstrip("/")
+    OPENAI_COSTS_URL = f"{api_base}/organization/costs"
+    OPENAI_PROJECTS_URL = f"{api_base}/organization/projects"
+
+    slow_request_ms = os.getenv("PROFILING_SLOW_REQUEST_MS")
+    if slow_request_ms:
+        app.config["PROFILING_SLOW_REQUEST_MS"] = float(slow_request_ms)
+        request_profiler.slow_threshold_ms = float(slow_request_ms)
+
+
+def _init_cors():
+    from flask_cors import CORS
+
+    # Enable CORS for development
+    CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"])
+
+
+def _init_cache():
+    global cache
+    from flask_caching import Cache
+
+    # The cache_entries and cache_evictions_total metrics read the entries of
+    # SimpleCache directly; other backends only report hits and misses
+    cache = Cache(app)
+
+
+def _init_database():
+    global _database_ready
+    init_database()
+    _database_ready = True
+
+
+def startup():
+    """Run the deferred initialization once, logging the time of every phase.
+
+    Phases that already finished are skipped when a failed startup is retried.
+    """
+    global _started
+    if _started:
+        return
+    with _startup_lock:
+        if _started:
+            return
+        for name, func in (
+            ("config", _load_config),
+            ("cors", _init_cors),
+            ("cache", _init_cache),
+            ("database", _init_database),
+        ):
+            if name in startup_timings:
+                continue
+            start = time.perf_counter()
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"Startup phase {name} failed: {str(e)}")
+                raise
+            startup_timings[name] = (time.perf_counter() - start) * 1000
+        _started = True
+
+    logger.info(
+        "Startup timings: "
+        + ", ".join(f"{name}={ms:.1f}ms" for name, ms in startup_timings.items())
+    )
+    start_warmup()
+
+
+def start_warmup():
+    """Sync the projects index in the background if it is not warm yet"""
+    global _warmup_thread
+    if not OPENAI_API_KEY or projects_index.is_synced():
+        return
+    with _warmup_lock:
+        if _warmup_thread and _warmup_thread.is_alive():
+            return
+        _warmup_thread = threading.Thread(target=_warmup, daemon=True)
+        _warmup_thread.start()
+
+
+def _warmup():
+    start = time.perf_counter()
+    try:
+        projects_index.ensure_fresh()
+    except Exception as e:
+        logger.warning(f"Warm-up of the projects index failed: {str(e)}")
+        return
+    startup_timings["warmup"] = (time.perf_counter() - start) * 1000
+    logger.info(f"Warm-up finished in {startup_timings['warmup']:.1f}ms")
+
+
+def _startup_middleware(wsgi_app):
+    # Runs before Flask handles the first request, so startup can still
+    # register request hooks (CORS)
+    def middleware(environ, start_response):
+        if not _started:
+            startup()
+        return wsgi_app(environ, start_response)
+
+    return middleware
+
+
+app.wsgi_app = _startup_middleware(app.wsgi_app)
+
+
+def enrich_costs_with_projects(costs_data):
+    """Add project name and archived status to every cost result"""
+    buckets = costs_data.get("data", [])
+    project_ids = {
+        result.get("project_id")
+        for bucket in buckets
+        for result in bucket.get("results", [])
+    }
+    try:
+        projects_index.ensure_fresh()
+        projects_index.ensure_known(project_ids)
+    except Exception as e:
+        logger.warning(f"Projects index unavailable, costs not enriched: {str(e)}")
+
+    for bucket in buckets:
+        for result in bucket.get("results", []):
+            project = projects_index.get(result.get("project_id"))
+            if project:
+                result["project_name"] = get_project_name(project)
+                result["project_archived"] = is_project_archived(project)
+            else:
+                result["project_name"] = None
+                result["project_archived"] = None
+    return costs_data
+
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    start = g.pop("request_start", None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            route=route,
+            method=request.method,
+            status=str(response.status_code),
+        )
+        if not response.direct_passthrough:
+            metrics.HTTP_RESPONSE_SIZE.observe(
+                response.calculate_content_length() or 0, route=route
+            )
+    return response
+
+
+@app.before_request
+def start_request_profiling():
+    g.profile_start = time.perf_counter()
+    if request.path.startswith("/api/admin/"):
+        return
+
+    # Admins can profile a single request with the X-Profile header
+    mode = request.headers.get("X-Profile")
+    if mode:
+        payload = get_token_payload() or {}
+        if payload.get("role") != "admin":
+            mode = None
+        elif mode not in PROFILE_MODES:
+            mode = request_profiler.mode
+    route = request.url_rule.rule if request.url_rule else None
+    if mode or request_profiler.should_profile(route):
+        try:
+            g.profiler = request_profiler.start(mode)
+        except ValueError as e:
+            # Another profiler may already be active in this interpreter
+            logger.warning(f"Could not start profiler: {str(e)}")
+
+
+@app.after_request
+def finish_request_profiling(response):
+    start = g.pop("profile_start", None)
+    profiler = g.pop("profiler", None)
+    if profiler:
+        profiler.stop()
+    if start is None:
+        return response
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    if profiler or duration_ms >= request_profiler.slow_threshold_ms:
+        payload = g.get("jwt_payload") or {}
+        capture = request_profiler.capture(
+            {
+                "method": request.method,
+                "path": request.path,
+                "query": request.query_string.decode(),
+                "route": request.url_rule.rule if request.url_rule else None,
+                "status": response.status_code,
+                "user": payload.get("username"),
+            },
+            duration_ms,
+            dict(g.get("phases", {})),
+            profiler,
+        )
+        logger.info(
+            f"Captured {capture['reason']} request {capture['id']}: "
+            f"{request.method} {request.path} took {duration_ms:.0f} ms"
+        )
+    return response
+
+
+def render_costs(costs_data, include_project_names=False, response_format="json"):
+    """Build the /costs response, optionally enriched and columnar encoded"""
+    if include_project_names:
+        with phase("enrich"):
+            enrich_costs_with_projects(costs_data)
+    with phase("serialize"):
+        if response_format == "columnar":
+            costs_data = encode_costs_columnar(costs_data)
+        return jsonify(costs_data)
 
 
 @app.route("/")
@@ -163,7 +618,8 @@ def login():
             return jsonify({"error": "Username and password are required"}), 400
 
         # Verify credentials using database
-        user = verify_user_credentials(username, password)
+        with metrics.SQLITE_DURATION.time(query="verify_user_credentials"):
+            user = verify_user_credentials(username, password)
         if user:
             # Generate token
             payload = {
@@ -174,9 +630,12 @@ def login():
                 + timedelta(hours=app.config["JWT_EXPIRATION_HOURS"]),
             }
 
-            token = jwt.encode(
-                payload, app.config["SECRET_KEY"], algorithm=app.config["JWT_ALGORITHM"]
-            )
+            with metrics.JWT_DURATION.time(operation="encode"):
+                token = jwt.encode(
+                    payload,
+                    app.config["SECRET_KEY"],
+                    algorithm=app.config["JWT_ALGORITHM"],
+                )
 
             return jsonify(
                 {
@@ -251,13 +710,128 @@ def api_status_with_prefix():
                 "login": "/api/login",
                 "change_password": "/api/change-password",
                 "costs": "/api/costs",
+                "cost_anomalies": "/api/costs/anomalies",
                 "projects": "/api/projects",
+                "metrics": "/api/metrics",
+                "ready": "/api/ready",
             },
             "timestamp": datetime.now().isoformat(),
         }
     )
 
 
+@app.route("/api/ready")
+def api_ready():
+    """Readiness endpoint, 503 until the database and caches are warm"""
+    start_warmup()
+    checks = {
+        "database": _database_ready,
+        "cache": cache is not None,
+        "projects_index": projects_index.is_synced() or not OPENAI_API_KEY,
+    }
+    ready = all(checks.values())
+    return (
+        jsonify(
+            {
+                "ready": ready,
+                "checks": checks,
+                "startup_ms": startup_timings,
+                "timestamp": datetime.now().isoformat(),
+            }
+        ),
+        200 if ready else 503,
+    )
+
+
+@app.route("/api/metrics")
+@require_metrics_auth
+def api_metrics():
+    """Metrics endpoint in the Prometheus text format"""
+    return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+
+@app.route("/api/admin/profiling", methods=["GET", "PUT"])
+@require_jwt
+@require_admin
+def profiling_settings():
+    """Get or update request profiling settings (admin only)"""
+    if request.method == "PUT":
+        try:
+            request_profiler.configure(**(request.get_json() or {}))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        logger.info(f"Profiling settings updated: {request_profiler.settings()}")
+    return jsonify(request_profiler.settings())
+
+
+@app.route("/api/admin/profiles", methods=["GET", "DELETE"])
+@require_jwt
+@require_admin
+def list_profiles():
+    """List or clear captured request profiles (admin only)"""
+    if request.method == "DELETE":
+        request_profiler.clear()
+        return jsonify({"message": "Profiles cleared"})
+    return jsonify({"object": "list", "data": request_profiler.list()})
+
+
+@app.route("/api/admin/profiles/<int:capture_id>", methods=["GET"])
+@require_jwt
+@require_admin
+def download_profile(capture_id):
+    """Download a captured request profile (admin only).
+
+    format=json (default) returns the whole capture, format=pstats the raw
+    cProfile statistics and format=collapsed the sampled stacks.
+    """
+    capture = request_profiler.get(capture_id)
+    if not capture:
+        return jsonify({"error": "Profile not found"}), 404
+
+    profile = capture["profile"] or {}
+    download_format = request.args.get("format", "json")
+    if download_format == "pstats" and "pstats" in profile:
+        return Response(
+            profile["pstats"],
+            mimetype="application/octet-stream",
+            headers={
+                "Content-Disposition": f"attachment; filename=profile-{capture_id}.pstats"
+            },
+        )
+    if download_format == "collapsed" and "collapsed" in profile:
+        return Response(
+            profile["collapsed"],
+            mimetype="text/plain",
+            headers={
+                "Content-Disposition": f"attachment; filename=profile-{capture_id}.txt"
+            },
+        )
+    if download_format != "json":
+        return (
+            jsonify({"error": f"Format {download_format} not available for this profile"}),
+            400,
+        )
+
+    capture = dict(capture)
+    if capture["profile"]:
+        capture["profile"] = {
+            key: value for key, value in profile.items() if key != "pstats"
+        }
+    return jsonify(capture)
+
+
+@app.route("/api/admin/cache/queries", methods=["GET"])
+@require_jwt
+@require_admin
+def canonical_query_report():
+    """Distinct raw /costs queries per canonical cache key (admin only)"""
+    try:
+        limit = int(request.args.get("limit", "50"))
+    except ValueError:
+        return jsonify({"error": "limit parameter must be an integer"}), 400
+    return jsonify(canonical_stats.report(limit=limit))
+
+
 @app.route("/api/costs", methods=["GET"])
 @require_jwt
 @require_api_key
@@ -266,6 +840,13 @@ def get_costs_with_prefix():
     return get_costs()
 
 
+@app.route("/api/costs/anomalies", methods=["GET"])
+@require_jwt
+def get_cost_anomalies_with_prefix():
+    """Get cost anomalies with /api prefix"""
+    return get_cost_anomalies()
+
+
 @app.route("/api/projects", methods=["GET"])
 @require_jwt
 @require_api_key
@@ -280,80 +861,58 @@ def get_projects_with_prefix():
 def get_costs():
     """Get OpenAI costs data"""
     try:
-        # Get query parameters
-        start_time = request.args.get("start_time")
-        end_time = request.args.get("end_time")
-        bucket_width = request.args.get("bucket_width", "1d")
-        group_by = request.args.getlist(
-            "group_by"
-        )  # Support multiple group_by parameters
-        limit = request.args.get("limit", "7")
-        page = request.args.get("page")
-        project_ids = request.args.getlist(
-            "project_ids"
-        )  # Support multiple project_ids
-
-        # Validate required parameters
-        if not start_time:
+        include_project_names = (
+            request.args.get("include_project_names", "false").lower() == "true"
+        )
+        response_format = request.args.get("format", "json")
+
+        if response_format not in ("json", "columnar"):
             return (
-                jsonify({"error": "start_time parameter is required (Unix seconds)"}),
+                jsonify({"error": "format parameter must be 'json' or 'columnar'"}),
                 400,
             )
 
-        # Normalize end_time to end of day for better caching
-        if end_time:
-            # Convert end_time to datetime and set to end of day (23:59:59)
-            end_datetime = datetime.fromtimestamp(int(end_time))
-            end_of_day = end_datetime.replace(
-                hour=23, minute=59, second=59, microsecond=999999
-            )
-            normalized_end_time = int(end_of_day.timestamp())
-        else:
-            # If no end_time provided, use current time
-            normalized_end_time = int(datetime.now().timestamp())
-
-        # Build request parameters
-        params = {
-            "start_time": start_time,
-            "bucket_width": bucket_width,
-            "limit": limit,
-        }
-
-        # Always use normalized end_time for consistent caching
-        params["end_time"] = normalized_end_time
-
-        if group_by:
-            params["group_by"] = group_by
-
-        if page:
-            params["page"] = page
+        # Canonical parameters: snapped range, sorted lists, derived limit
+        try:
+            params = canonicalize_costs_query(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        if project_ids:
-            params["project_ids"] = project_ids
+        bucket_width = params["bucket_width"]
+        project_ids = params.get("project_ids")
 
-        # Generate cache key based on normalized parameters only
+        # Semantically equal requests share one cache entry
         cache_key = generate_cache_key("/costs", params)
+        canonical_stats.record(cache_key, params, raw_query_fingerprint(request.args))
 
         # Check cache first
-        cached_response = cache.get(cache_key)
+        with phase("cache_lookup"):
+            cached_response = cache_get("costs", cache_key)
         if cached_response:
             logger.info(f"Cache hit for key: {cache_key}")
-            return jsonify(cached_response)
+            return render_costs(cached_response, include_project_names, response_format)
 
         # If not in cache, make API request
-        response = requests.get(
-            OPENAI_COSTS_URL,
-            headers=get_openai_headers(),
-            params=params,
-            timeout=60,
-        )
+        response = openai_get(OPENAI_COSTS_URL, "costs", params, timeout=60)
 
         if response.status_code == 200:
-            response_data = response.json()
+            with phase("parse"):
+                response_data = response.json()
             # Cache the successful response
-            cache.set(cache_key, response_data)
+            cache_set("costs", cache_key, response_data)
             logger.info(f"Cached response for key: {cache_key}")
-            return jsonify(response_data)
+            # Feed daily buckets to the rolling spend statistics
+            if bucket_width == "1d":
+                try:
+                    spend_tracker.ingest(
+                        response_data,
+                        include_models=not project_ids,
+                        project_ids=project_ids,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to update spend statistics: {str(e)}")
+            # The cache keeps its own copy, so enrichment does not leak into it
+            return render_costs(response_data, include_project_names, response_format)
         else:
             logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
             return (
@@ -377,6 +936,51 @@ def get_costs():
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
+@app.route("/costs/anomalies", methods=["GET"])
+@require_jwt
+def get_cost_anomalies():
+    """Get projects and models whose latest daily spend looks anomalous"""
+    try:
+        dimension = request.args.get("dimension")
+        if dimension not in (None, "project", "model"):
+            return (
+                jsonify({"error": "dimension parameter must be 'project' or 'model'"}),
+                400,
+            )
+
+        thresholds = {
+            "z_threshold": float(
+                request.args.get("z_threshold", app.config["ANOMALY_Z_THRESHOLD"])
+            ),
+            "dod_threshold": float(
+                request.args.get("dod_threshold", app.config["ANOMALY_DOD_THRESHOLD"])
+            ),
+            "min_amount": float(
+                request.args.get("min_amount", app.config["ANOMALY_MIN_AMOUNT"])
+            ),
+            "min_history": int(
+                request.args.get("min_history", app.config["ANOMALY_MIN_HISTORY"])
+            ),
+        }
+    except ValueError:
+        return jsonify({"error": "Threshold parameters must be numbers"}), 400
+
+    anomalies = spend_tracker.anomalies(dimension=dimension, **thresholds)
+    for anomaly in anomalies:
+        if anomaly["dimension"] == "project":
+            project = projects_index.get(anomaly["key"])
+            anomaly["project_name"] = get_project_name(project) if project else None
+
+    return jsonify(
+        {
+            "object": "list",
+            "data": anomalies,
+            "thresholds": thresholds,
+            "series_count": spend_tracker.series_count(),
+        }
+    )
+
+
 @app.route("/projects", methods=["GET"])
 @require_jwt
 @require_api_key
@@ -385,47 +989,53 @@ def get_projects():
     try:
         # Get query parameters
         after = request.args.get("after")
-        include_archived = request.args.get("include_archived", "false")
-        limit = request.args.get("limit", "20")
-
-        # Build request parameters
-        params = {"include_archived": include_archived, "limit": limit}
-
-        if after:
-            params["after"] = after
+        include_archived = request.args.get("include_archived", "false").lower() == "true"
+        limit = request.args.get("limit")
+        search = request.args.get("search")
 
-        # Generate cache key based on all parameters
-        cache_key = generate_cache_key("/projects", params)
+        # Serve from the projects index, syncing it first if needed
+        fresh = projects_index.ensure_fresh()
+        metrics.CACHE_REQUESTS.inc(family="projects", result="hit" if fresh else "miss")
 
-        # Check cache first
-        cached_response = cache.get(cache_key)
-        if cached_response:
-            logger.info(f"Cache hit for key: {cache_key}")
-            return jsonify(cached_response)
+        if search:
+            projects = projects_index.search(search, include_archived=include_archived)
+        else:
+            projects = projects_index.list(include_archived=include_archived)
 
-        # If not in cache, make API request
-        response = requests.get(
-            OPENAI_PROJECTS_URL, headers=get_openai_headers(), params=params, timeout=30
+        # Cursor-based pagination over the index
+        if after:
+            ids = [project["id"] for project in projects]
+            start = ids.index(after) + 1 if after in ids else len(ids)
+            projects = projects[start:]
+
+        has_more = False
+        if limit:
+            limit = int(limit)
+            has_more = len(projects) > limit
+            projects = projects[:limit]
+
+        return jsonify(
+            {
+                "object": "list",
+                "data": projects,
+                "first_id": projects[0]["id"] if projects else None,
+                "last_id": projects[-1]["id"] if projects else None,
+                "has_more": has_more,
+            }
         )
 
-        if response.status_code == 200:
-            response_data = response.json()
-            # Cache the successful response
-            cache.set(cache_key, response_data)
-            logger.info(f"Cached response for key: {cache_key}")
-            return jsonify(response_data)
-        else:
-            logger.error(f"OpenAI API error: {response.status_code} - {response.text}")
-            return (
-                jsonify(
-                    {
-                        "error": f"OpenAI API error: {response.status_code}",
-                        "details": response.text,
-                    }
-                ),
-                response.status_code,
-            )
-
+    except ProjectsFetchError as e:
+        return (
+            jsonify(
+                {
+                    "error": f"OpenAI API error: {e.status_code}",
+                    "details": e.details,
+                }
+            ),
+            e.status_code,
+        )
+    except ValueError:
+        return jsonify({"error": "limit parameter must be an integer"}), 400
     except requests.exceptions.RequestException as e:
         logger.error(f"Request error: {str(e)}")
         return (
@@ -447,13 +1057,13 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 
+startup_timings["imports"] = (time.perf_counter() - _import_start) * 1000
+
+
 if __name__ == "__main__":
-    # Initialize database before starting the app
-    try:
-        init_database()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {str(e)}")
-        raise
+    # Initialize configuration, caches and database before starting the app,
+    # in the serving process only (not in the parent of the debug reloader)
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        startup()
 
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,261 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Default histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FAST_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1,
+)
+SIZE_BUCKETS = tuple(256 * 4**i for i in range(10))  # 256 B .. 64 MB
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function):
+        """Compute the (unlabeled) value when metrics are rendered"""
+        self._function = function
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self):
+        if self._function is not None:
+            self.set(self._function())
+        return super().render()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum, count]
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_sample(self, key, state):
+        with self._lock:
+            counts, total, count = list(state[0]), state[1], state[2]
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- Application metrics ---
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Latency of HTTP requests by route",
+        ("route", "method", "status"),
+    )
+)
+HTTP_RESPONSE_SIZE = REGISTRY.register(
+    Histogram(
+        "http_response_size_bytes",
+        "Size of HTTP response bodies by route",
+        ("route",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+UPSTREAM_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "upstream_request_duration_seconds",
+        "Latency of OpenAI API requests by endpoint",
+        ("endpoint", "status"),
+    )
+)
+UPSTREAM_RESPONSE_SIZE = REGISTRY.register(
+    Histogram(
+        "upstream_response_size_bytes",
+        "Size of OpenAI API response bodies by endpoint",
+        ("endpoint",),
+        buckets=SIZE_BUCKETS,
+    )
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "upstream_requests_in_flight",
+        "OpenAI API requests currently in progress",
+        ("endpoint",),
+    )
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "cache_requests_total",
+        "Cache lookups by key family and result (hit or miss)",
+        ("family", "result"),
+    )
+)
+CACHE_EVICTIONS = REGISTRY.register(
+    Counter(
+        "cache_evictions_total",
+        "Entries removed from the cache by pruning, by key family",
+        ("family",),
+    )
+)
+CACHE_ENTRIES = REGISTRY.register(
+    Gauge("cache_entries", "Number of entries currently in the response cache")
+)
+PROJECTS_INDEX_DELETIONS = REGISTRY.register(
+    Counter(
+        "projects_index_deleted_total",
+        "Projects dropped from the index because they were deleted upstream",
+    )
+)
+JWT_DURATION = REGISTRY.register(
+    Histogram(
+        "jwt_duration_seconds",
+        "Time spent encoding and decoding JWT tokens",
+        ("operation",),
+        buckets=FAST_LATENCY_BUCKETS,
+    )
+)
+SQLITE_DURATION = REGISTRY.register(
+    Histogram(
+        "sqlite_query_duration_seconds",
+        "Time spent in user database lookups",
+        ("query",),
+        buckets=FAST_LATENCY_BUCKETS,
+    )
+)
@@ -0,0 +1,234 @@
+import io
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import deque, Counter
+from contextlib import contextmanager
+
+from flask import g, has_app_context
+
+PROFILE_MODES = ("sampling", "deterministic")
+
+
+@contextmanager
+def phase(name):
+    """Record the time spent in a phase of the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # Background work (e.g. the projects index warm-up) has no request
+        if has_app_context():
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            phases = g.setdefault("phases", {})
+            phases[name] = phases.get(name, 0.0) + elapsed_ms
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stack of a single thread"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def result(self):
+        """Collapsed stacks (flame graph input) and top frames by self time"""
+        own = Counter()
+        for stack, count in self.samples.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "mode": "sampling",
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.samples.values()),
+            "top": [
+                {"frame": frame, "samples": count} for frame, count in own.most_common(30)
+            ],
+            "collapsed": "\n".join(
+                f"{stack} {count}" for stack, count in self.samples.most_common()
+            ),
+        }
+
+
+class DeterministicProfiler:
+    """cProfile based profiler of the current thread"""
+
+    def __init__(self):
+        import cProfile
+
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self):
+        self._profile.disable()
+
+    def result(self):
+        import marshal
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(30)
+        return {
+            "mode": "deterministic",
+            "report": stream.getvalue(),
+            "pstats": marshal.dumps(stats.stats),
+        }
+
+
+def _number(settings, name, default):
+    value = settings.get(name, default)
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    return float(value)
+
+
+class RequestProfiler:
+    """Selects requests to profile and keeps the last captures in a ring buffer.
+
+    Profiling is off by default. When enabled by an admin, requests to the
+    selected routes are profiled with the given probability. Requests slower
+    than the slow threshold are always captured with their phase breakdown,
+    even when they were not profiled.
+    """
+
+    def __init__(self, capacity=50, slow_threshold_ms=5000, sampling_interval_ms=5):
+        self.enabled = False
+        self.mode = "sampling"
+        self.routes = []
+        self.sample_rate = 1.0
+        self.slow_threshold_ms = slow_threshold_ms
+        self.sampling_interval_ms = sampling_interval_ms
+
+        self._captures = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def settings(self):
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "routes": self.routes,
+            "sample_rate": self.sample_rate,
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "sampling_interval_ms": self.sampling_interval_ms,
+            "capacity": self._captures.maxlen,
+        }
+
+    def configure(self, **settings):
+        """Update settings, raise ValueError on invalid values"""
+        mode = settings.get("mode", self.mode)
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {', '.join(PROFILE_MODES)}")
+        sample_rate = _number(settings, "sample_rate", self.sample_rate)
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        routes = settings.get("routes", self.routes)
+        if not isinstance(routes, list):
+            raise ValueError("routes must be a list")
+        slow_threshold_ms = _number(settings, "slow_threshold_ms", self.slow_threshold_ms)
+        sampling_interval_ms = _number(
+            settings, "sampling_interval_ms", self.sampling_interval_ms
+        )
+        if sampling_interval_ms <= 0:
+            raise ValueError("sampling_interval_ms must be positive")
+        capacity = settings.get("capacity", self._captures.maxlen)
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity < 1:
+            raise ValueError("capacity must be an integer of at least 1")
+        enabled = settings.get("enabled", self.enabled)
+        if not isinstance(enabled, bool):
+            raise ValueError("enabled must be true or false")
+
+        self.enabled = enabled
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.routes = routes
+        self.slow_threshold_ms = slow_threshold_ms
+        self.sampling_interval_ms = sampling_interval_ms
+        if capacity != self._captures.maxlen:
+            with self._lock:
+                self._captures = deque(self._captures, maxlen=capacity)
+
+    def should_profile(self, route):
+        if not self.enabled:
+            return False
+        if self.routes and route not in self.routes:
+            return False
+        return random.random() < self.sample_rate
+
+    def start(self, mode=None):
+        """Start profiling the current thread"""
+        mode = mode or self.mode
+        if mode == "deterministic":
+            profiler = DeterministicProfiler()
+        else:
+            profiler = SamplingProfiler(
+                threading.get_ident(), self.sampling_interval_ms / 1000
+            )
+        profiler.start()
+        return profiler
+
+    def capture(self, info, duration_ms, phases, profiler=None):
+        """Store a request capture in the ring buffer"""
+        reason = "profiled" if profiler else "slow"
+        capture = dict(
+            info,
+            id=next(self._ids),
+            timestamp=time.time(),
+            reason=reason,
+            duration_ms=duration_ms,
+            phases=phases,
+            profile=profiler.result() if profiler else None,
+        )
+        with self._lock:
+            self._captures.append(capture)
+        return capture
+
+    def list(self):
+        """Capture summaries, newest first"""
+        with self._lock:
+            captures = list(self._captures)
+        summaries = []
+        for capture in reversed(captures):
+            summary = {key: value for key, value in capture.items() if key != "profile"}
+            summary["profile_mode"] = (
+                capture["profile"]["mode"] if capture["profile"] else None
+            )
+            summaries.append(summary)
+        return summaries
+
+    def get(self, capture_id):
+        with self._lock:
+            for capture in self._captures:
+                if capture["id"] == capture_id:
+                    return capture
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._captures.clear()
@@ -0,0 +1,304 @@
+import bisect
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectsFetchError(Exception):
+    """Raised when a projects page cannot be fetched from the OpenAI API"""
+
+    def __init__(self, status_code, details):
+        super().__init__(f"OpenAI API error: {status_code}")
+        self.status_code = status_code
+        self.details = details
+
+
+def get_project_name(project):
+    """Get display name of a project"""
+    return project.get("name") or project.get("title") or project["id"]
+
+
+def is_project_archived(project):
+    """Check if a project is archived"""
+    return bool(project.get("archived")) or project.get("status") == "archived"
+
+
+class ProjectsIndex:
+    """In-memory index of all projects of the organization.
+
+    The first use walks every page of the projects list once. After that the
+    index is refreshed incrementally: the head of the list is scanned until a
+    page without changes is found, and the tail is scanned from the last known
+    cursor. This picks up new projects and changes near the head of the list;
+    a project renamed or archived on a later page is only seen by the periodic
+    full resync, so it can be up to full_sync_interval stale. The full resync
+    also drops deleted projects.
+
+    Failed updates are retried with exponential backoff (retry_backoff
+    seconds, doubling up to refresh_interval), and once the index is synced
+    requests never wait for an update another thread is running.
+
+    Lookups by id are O(1); prefix search by name uses a sorted name list.
+    """
+
+    def __init__(
+        self,
+        fetch_page,
+        page_size=100,
+        refresh_interval=300,
+        full_sync_interval=3600,
+        retry_backoff=30,
+        on_evict=None,
+    ):
+        # fetch_page(after, limit) -> OpenAI list response (dict)
+        self._fetch_page = fetch_page
+        # on_evict(count) is called when a full sync drops deleted projects
+        self._on_evict = on_evict
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.full_sync_interval = full_sync_interval
+        self.retry_backoff = retry_backoff
+
+        self._projects = {}  # project id -> project
+        self._order = []  # project ids in upstream list order
+        self._names = []  # sorted (lowercase name, project id)
+        self._last_id = None
+
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+        self._last_full_sync = None
+        self._last_refresh = None
+        self._last_attempt = None
+        self._failures = 0
+        self._last_error = None
+
+    # --- Synchronization ---
+
+    def ensure_fresh(self):
+        """Sync or refresh the index if it is stale.
+
+        Upstream errors are raised only when the index has never been synced;
+        otherwise the stale index keeps being served. Returns True if the
+        index was served as is, without any upstream request.
+        """
+        now = time.time()
+        stamp = self._last_attempt
+        if self._last_full_sync is None:
+            func = self._sync
+        elif now - self._last_full_sync >= self.full_sync_interval:
+            func = self._sync
+        elif now - self._last_refresh >= self.refresh_interval:
+            func = self._refresh
+        else:
+            return True
+
+        if self._backing_off(now):
+            if self._last_full_sync is None:
+                raise self._last_error
+            return True
+
+        try:
+            return not self._update(func, stamp)
+        except Exception as e:
+            if self._last_full_sync is None:
+                raise
+            logger.warning(f"Projects index update failed, serving stale data: {e}")
+            return False
+
+    def ensure_known(self, project_ids):
+        """Refresh once if some of the given project ids are not indexed yet"""
+        missing = [pid for pid in project_ids if pid and pid not in self._projects]
+        if not missing or self._last_full_sync is None:
+            return
+        # Avoid hammering the API for ids that simply do not exist anymore
+        now = time.time()
+        stamp = self._last_attempt
+        if stamp is not None and (
+            now - stamp < min(60, self.refresh_interval) or self._backing_off(now)
+        ):
+            return
+        self._safe(self._update, self._refresh, stamp)
+
+    def sync(self):
+        """Fetch every page and replace the index"""
+        with self._sync_lock:
+            self._last_attempt = time.time()
+            self._sync()
+
+    def refresh(self):
+        """Fetch only new or changed projects"""
+        with self._sync_lock:
+            self._last_attempt = time.time()
+            self._refresh()
+
+    def _update(self, func, stamp):
+        """Run func under the sync lock, return True if it was run.
+
+        Before the first sync callers wait for the running sync; afterwards
+        they skip the update and keep serving the stale index.
+        """
+        if not self._sync_lock.acquire(blocking=self._last_full_sync is None):
+            return False
+        try:
+            # Skip if another thread attempted an update while we were waiting
+            if self._last_attempt != stamp:
+                if self._last_full_sync is None and self._last_error:
+                    raise self._last_error
+                return False
+            self._last_attempt = time.time()
+            try:
+                func()
+            except Exception as e:
+                self._failures += 1
+                self._last_error = e
+                raise
+            self._failures = 0
+            self._last_error = None
+            return True
+        finally:
+            self._sync_lock.release()
+
+    def _backing_off(self, now):
+        """Check if a failed update should not be retried yet"""
+        if not self._failures:
+            return False
+        delay = min(
+            self.retry_backoff * 2 ** (self._failures - 1),
+            max(self.refresh_interval, self.retry_backoff),
+        )
+        return now - self._last_attempt < delay
+
+    def _sync(self):
+        projects = {}
+        order = []
+        after = None
+        while True:
+            page = self._fetch_page(after, self.page_size)
+            data = page.get("data", [])
+            for project in data:
+                if project["id"] not in projects:
+                    order.append(project["id"])
+                projects[project["id"]] = project
+            if not page.get("has_more") or not data:
+                break
+            after = page.get("last_id") or data[-1]["id"]
+
+        names = sorted(
+            (get_project_name(p).lower(), pid) for pid, p in projects.items()
+        )
+        with self._lock:
+            evicted = len(self._projects.keys() - projects.keys())
+            self._projects = projects
+            self._order = order
+            self._names = names
+            self._last_id = order[-1] if order else None
+            now = time.time()
+            self._last_full_sync = now
+            self._last_refresh = now
+
+        logger.info(f"Projects index synced: {len(projects)} projects")
+        if evicted and self._on_evict:
+            self._on_evict(evicted)
+
+    def _refresh(self):
+        changed = 0
+
+        # Head scan: stop at the first page without any change
+        after = None
+        while True:
+            page = self._fetch_page(after, self.page_size)
+            data = page.get("data", [])
+            page_changes = self._merge(data, after)
+            changed += page_changes
+            if not page_changes or not page.get("has_more") or not data:
+                break
+            after = page.get("last_id") or data[-1]["id"]
+
+        # Tail scan: pick up projects listed after the last known cursor
+        after = self._last_id
+        while after:
+            page = self._fetch_page(after, self.page_size)
+            data = page.get("data", [])
+            changed += self._merge(data, after)
+            if not page.get("has_more") or not data:
+                break
+            after = page.get("last_id") or data[-1]["id"]
+
+        self._last_refresh = time.time()
+        if changed:
+            logger.info(f"Projects index refreshed: {changed} changed projects")
+
+    def _merge(self, projects, after=None):
+        """Merge a page of projects into the index, return number of changes.
+
+        New projects are placed right after the project preceding them on the
+        page, starting from the page cursor (or the head of the list).
+        """
+        changes = 0
+        with self._lock:
+            prev = after
+            for project in projects:
+                pid = project["id"]
+                old = self._projects.get(pid)
+                if old != project:
+                    changes += 1
+                    if old is not None:
+                        self._remove_name(old)
+                    else:
+                        pos = self._order.index(prev) + 1 if prev in self._projects else 0
+                        self._order.insert(pos, pid)
+                    self._projects[pid] = project
+                    bisect.insort(
+                        self._names, (get_project_name(project).lower(), pid)
+                    )
+                prev = pid
+            self._last_id = self._order[-1] if self._order else None
+        return changes
+
+    def _remove_name(self, project):
+        entry = (get_project_name(project).lower(), project["id"])
+        i = bisect.bisect_left(self._names, entry)
+        if i < len(self._names) and self._names[i] == entry:
+            del self._names[i]
+
+    def _safe(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            logger.warning(f"Projects index update failed, serving stale data: {e}")
+
+    # --- Queries ---
+
+    def get(self, project_id):
+        """Get a project by id"""
+        return self._projects.get(project_id)
+
+    def list(self, include_archived=False):
+        """List projects in upstream order"""
+        projects = self._projects
+        return [
+            projects[pid]
+            for pid in self._order
+            if pid in projects
+            and (include_archived or not is_project_archived(projects[pid]))
+        ]
+
+    def search(self, prefix, include_archived=False):
+        """Find projects whose name starts with prefix (case-insensitive)"""
+        prefix = prefix.lower()
+        with self._lock:
+            names = self._names
+            i = bisect.bisect_left(names, (prefix, ""))
+            results = []
+            while i < len(names) and names[i][0].startswith(prefix):
+                project = self._projects[names[i][1]]
+                if include_archived or not is_project_archived(project):
+                    results.append(project)
+                i += 1
+        return results
+
+    def is_synced(self):
+        return self._last_full_sync is not None
+
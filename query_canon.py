@@ -0,0 +1,155 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+# Bucket widths supported by the costs API, in seconds
+BUCKET_WIDTHS = {"1m": 60, "1h": 3600, "1d": 86400}
+# Maximum number of buckets per page for every bucket width
+MAX_LIMITS = {"1m": 1440, "1h": 168, "1d": 180}
+
+# Parameters that change the upstream result, everything else is stripped
+LIST_PARAMETERS = ("group_by", "project_ids")
+
+
+def _ceil_to(value, width):
+    return -(-value // width) * width
+
+
+def canonicalize_costs_query(args, now=None):
+    """Build canonical upstream parameters for a /costs query.
+
+    Both range ends are snapped to bucket boundaries (UTC), the end is capped
+    at the end of the current bucket, list parameters are sorted and
+    deduplicated, and limit is derived from the range, so semantically equal
+    requests produce the same parameters. Parameters that do not change the
+    upstream result (limit, format, include_project_names, cache busters)
+    are dropped. Raises ValueError on invalid parameters.
+
+    args is a werkzeug MultiDict (request.args) or a dict of lists.
+    """
+    getlist = args.getlist if hasattr(args, "getlist") else lambda k: args.get(k, [])
+    get = lambda k, default=None: (getlist(k) or [default])[0]
+
+    bucket_width = get("bucket_width", "1d")
+    width = BUCKET_WIDTHS.get(bucket_width)
+    if width is None:
+        raise ValueError(
+            f"bucket_width must be one of {', '.join(BUCKET_WIDTHS)}"
+        )
+
+    start_time = get("start_time")
+    if not start_time:
+        raise ValueError("start_time parameter is required (Unix seconds)")
+    try:
+        start_time = int(start_time)
+    except ValueError:
+        raise ValueError("start_time parameter must be Unix seconds")
+
+    now = int(now if now is not None else time.time())
+    latest_end = _ceil_to(now + 1, width)
+    end_time = get("end_time")
+    try:
+        end_time = int(end_time) if end_time else latest_end
+    except ValueError:
+        raise ValueError("end_time parameter must be Unix seconds")
+
+    start_time = start_time // width * width
+    end_time = min(_ceil_to(end_time, width), latest_end)
+    if end_time <= start_time:
+        raise ValueError("start_time must be before end_time")
+
+    params = {
+        "start_time": start_time,
+        "end_time": end_time,
+        "bucket_width": bucket_width,
+        "limit": min((end_time - start_time) // width, MAX_LIMITS[bucket_width]),
+    }
+
+    for name in LIST_PARAMETERS:
+        values = sorted(
+            {
+                value.strip()
+                for raw in getlist(name)
+                for value in raw.split(",")
+                if value.strip()
+            }
+        )
+        if values:
+            params[name] = values
+
+    page = get("page")
+    if page:
+        params["page"] = page
+
+    return params
+
+
+def generate_cache_key(endpoint: str, params: dict = None) -> str:
+    """Generate a unique cache key based on endpoint and parameters"""
+    key_data = {"endpoint": endpoint, "params": params or {}}
+    key_string = json.dumps(key_data, sort_keys=True)
+    return hashlib.md5(key_string.encode()).hexdigest()
+
+
+def raw_query_fingerprint(args):
+    """Fingerprint of a query exactly as the client sent it.
+
+    args is a werkzeug MultiDict (request.args) or a dict of lists.
+    """
+    if hasattr(args, "getlist"):
+        items = args.items(multi=True)
+    else:
+        items = ((key, value) for key, values in args.items() for value in values)
+    return hashlib.md5(json.dumps(sorted(items)).encode()).hexdigest()
+
+
+class CanonicalQueryStats:
+    """Counts how many distinct raw queries map to each canonical cache key.
+
+    Keeps at most max_keys canonical keys (least recently used are dropped)
+    and max_raw fingerprints per key, so memory stays bounded.
+    """
+
+    def __init__(self, max_keys=1000, max_raw=256):
+        self.max_keys = max_keys
+        self.max_raw = max_raw
+        self._keys = OrderedDict()  # cache key -> entry
+        self._lock = threading.Lock()
+
+    def record(self, cache_key, params, raw_fingerprint):
+        with self._lock:
+            entry = self._keys.get(cache_key)
+            if entry is None:
+                entry = {"params": params, "raw": set(), "requests": 0}
+                self._keys[cache_key] = entry
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+            else:
+                self._keys.move_to_end(cache_key)
+            entry["requests"] += 1
+            if len(entry["raw"]) < self.max_raw:
+                entry["raw"].add(raw_fingerprint)
+
+    def report(self, limit=50):
+        """Canonical keys with the most distinct raw queries first"""
+        with self._lock:
+            entries = [
+                {
+                    "cache_key": key,
+                    "params": entry["params"],
+                    "distinct_raw_queries": len(entry["raw"]),
+                    "requests": entry["requests"],
+                }
+                for key, entry in self._keys.items()
+            ]
+        entries.sort(key=lambda e: (e["distinct_raw_queries"], e["requests"]), reverse=True)
+        distinct_raw = sum(e["distinct_raw_queries"] for e in entries)
+        return {
+            "canonical_keys": len(entries),
+            "distinct_raw_queries": distinct_raw,
+            "requests": sum(e["requests"] for e in entries),
+            "raw_queries_per_key": distinct_raw / len(entries) if entries else None,
+            "data": entries[:limit],
+        }
@@ -0,0 +1,254 @@
+import math
+import threading
+import time
+from collections import deque
+
+SECONDS_PER_DAY = 86400
+
+
+class RollingSeries:
+    """Rolling statistics of a single spend series.
+
+    Every update is O(1): the rolling window keeps a running sum and sum of
+    squares, and the EWMA is updated in place. Statistics of the window are
+    captured right before a new value is pushed, so the latest value is
+    always compared against its own history.
+    """
+
+    def __init__(self, window=14, alpha=0.3, bucket_width=SECONDS_PER_DAY):
+        self.window = window
+        self.alpha = alpha
+        self.bucket_width = bucket_width
+
+        self._values = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+        self.count = 0
+        self.ewma = None
+        self.last_start = None
+        self.last_value = None
+        self.prev_value = None
+
+        # Baseline of the window before the latest value
+        self.baseline_mean = None
+        self.baseline_std = None
+        self.baseline_ewma = None
+        self.baseline_count = 0
+
+    def update(self, start_time, value):
+        """Add the value of the bucket starting at start_time.
+
+        Buckets older than or equal to the last seen bucket are ignored;
+        missing buckets in between are counted as zero spend.
+        """
+        if self.last_start is not None:
+            if start_time <= self.last_start:
+                return False
+            gap = (start_time - self.last_start) // self.bucket_width - 1
+            if gap > 0:
+                for _ in range(min(gap, self.window)):
+                    self._push(0.0)
+                self.ewma *= (1 - self.alpha) ** gap
+                self.last_value = 0.0
+
+        self.baseline_count = len(self._values)
+        self.baseline_mean = self.mean()
+        self.baseline_std = self.std()
+        self.baseline_ewma = self.ewma
+
+        self._push(value)
+        self.ewma = value if self.ewma is None else (
+            self.alpha * value + (1 - self.alpha) * self.ewma
+        )
+        self.prev_value = self.last_value
+        self.last_value = value
+        self.last_start = start_time
+        self.count += 1
+        return True
+
+    def _push(self, value):
+        self._values.append(value)
+        self._sum += value
+        self._sumsq += value * value
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+
+    def mean(self):
+        n = len(self._values)
+        return self._sum / n if n else None
+
+    def std(self):
+        n = len(self._values)
+        if not n:
+            return None
+        mean = self._sum / n
+        # Clamp tiny negative values caused by floating point drift
+        return math.sqrt(max(self._sumsq / n - mean * mean, 0.0))
+
+    def zscore(self):
+        """Deviation of the latest value from its baseline in std-devs"""
+        if not self.baseline_count or self.baseline_std is None:
+            return None
+        if self.baseline_std == 0:
+            return 0.0 if self.last_value == self.baseline_mean else math.inf
+        return (self.last_value - self.baseline_mean) / self.baseline_std
+
+    def day_over_day(self):
+        """Absolute and relative change of the latest value"""
+        if self.prev_value is None:
+            return None, None
+        delta = self.last_value - self.prev_value
+        ratio = delta / self.prev_value if self.prev_value else None
+        return delta, ratio
+
+    def to_dict(self):
+        delta, ratio = self.day_over_day()
+        zscore = self.zscore()
+        return {
+            "bucket_start_time": self.last_start,
+            "latest": self.last_value,
+            "previous": self.prev_value,
+            "day_over_day_delta": delta,
+            "day_over_day_ratio": ratio,
+            "ewma": self.ewma,
+            "rolling_mean": self.mean(),
+            "rolling_std": self.std(),
+            "baseline_mean": self.baseline_mean,
+            "baseline_std": self.baseline_std,
+            "baseline_ewma": self.baseline_ewma,
+            "zscore": None if zscore is None or math.isinf(zscore) else zscore,
+            "history": self.count,
+        }
+
+
+class SpendTracker:
+    """Per-project and per-model spend series fed from costs responses"""
+
+    def __init__(self, window=14, alpha=0.3, bucket_width=SECONDS_PER_DAY):
+        self.window = window
+        self.alpha = alpha
+        self.bucket_width = bucket_width
+        self._series = {}  # (dimension, key) -> RollingSeries
+        self._latest_start = None  # newest ingested bucket
+        self._lock = threading.Lock()
+
+    def ingest(self, costs_data, include_models=True, project_ids=None, now=None):
+        """Update series from an OpenAI costs response.
+
+        Only completed buckets are used. Results are summed per project (when
+        grouped by project_id) and per model (when grouped by line_item), so
+        every series receives a single value per bucket. Known series of a
+        grouped dimension without a row in a bucket receive zero spend; with
+        project_ids, only those projects are filled.
+        """
+        now = now if now is not None else time.time()
+        buckets = sorted(
+            costs_data.get("data", []), key=lambda bucket: bucket["start_time"]
+        )
+        results = [r for bucket in buckets for r in bucket.get("results", [])]
+        dimensions = set()
+        if any(r.get("project_id") for r in results):
+            dimensions.add("project")
+        if include_models and any(r.get("line_item") for r in results):
+            dimensions.add("model")
+        wanted = set(project_ids) if project_ids else None
+
+        updated = 0
+        with self._lock:
+            for bucket in buckets:
+                if bucket.get("end_time", now) > now:
+                    continue
+
+                totals = {}
+                for result in bucket.get("results", []):
+                    value = result.get("amount", {}).get("value") or 0.0
+                    project_id = result.get("project_id")
+                    line_item = result.get("line_item")
+                    if project_id:
+                        key = ("project", project_id)
+                        totals[key] = totals.get(key, 0.0) + value
+                    if line_item and include_models:
+                        key = ("model", line_item)
+                        totals[key] = totals.get(key, 0.0) + value
+
+                for key in self._series:
+                    dim, name = key
+                    if key in totals or dim not in dimensions:
+                        continue
+                    if dim == "project" and wanted is not None and name not in wanted:
+                        continue
+                    totals[key] = 0.0
+
+                for key, value in totals.items():
+                    series = self._series.get(key)
+                    if series is None:
+                        series = RollingSeries(
+                            self.window, self.alpha, self.bucket_width
+                        )
+                        self._series[key] = series
+                    if series.update(bucket["start_time"], value):
+                        updated += 1
+
+                if self._latest_start is None or bucket["start_time"] > self._latest_start:
+                    self._latest_start = bucket["start_time"]
+        return updated
+
+    def stats(self, dimension=None):
+        """Get current statistics of every series"""
+        with self._lock:
+            return [
+                dict(dimension=dim, key=key, **series.to_dict())
+                for (dim, key), series in self._series.items()
+                if dimension is None or dim == dimension
+            ]
+
+    def anomalies(
+        self,
+        z_threshold=3.0,
+        dod_threshold=1.0,
+        min_amount=1.0,
+        min_history=3,
+        dimension=None,
+    ):
+        """Find series whose latest bucket looks anomalous.
+
+        A series is reported when its latest value is at least min_amount and
+        either its z-score against the rolling window reaches z_threshold or
+        its day-over-day increase reaches dod_threshold (1.0 = +100%).
+        The cost depends on the number of series only, not on the history.
+        """
+        anomalies = []
+        with self._lock:
+            for (dim, key), series in self._series.items():
+                if dimension is not None and dim != dimension:
+                    continue
+                # History before the latest bucket, not limited to the window
+                # Only the newest bucket is current, older ones are stale
+                if series.last_start != self._latest_start:
+                    continue
+                if series.count - 1 < min_history:
+                    continue
+                if series.last_value < min_amount:
+                    continue
+
+                reasons = []
+                zscore = series.zscore()
+                if zscore is not None and zscore >= z_threshold:
+                    reasons.append("zscore")
+                _, ratio = series.day_over_day()
+                if ratio is not None and ratio >= dod_threshold:
+                    reasons.append("day_over_day")
+
+                if reasons:
+                    anomaly = dict(dimension=dim, key=key, **series.to_dict())
+                    anomaly["reasons"] = reasons
+                    anomalies.append((zscore or 0.0, anomaly))
+
+        anomalies.sort(key=lambda item: item[0], reverse=True)
+        return [anomaly for _, anomaly in anomalies]
+
+    def series_count(self):
+        return len(self._series)
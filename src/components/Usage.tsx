@@ -1,13 +1,11 @@
 import React, { useState, useEffect } from 'react';
 import { Container, Card, Alert, Spinner, Badge, Table, Row, Col, ProgressBar, ButtonGroup, Button } from 'react-bootstrap';
 import api from '../services/api';
-import { Usage as UsageModel, CostsApiResponse } from '../models/usage';
-import { ProjectsManager, ProjectsResponse } from '../models/projects';
+import { Usage as UsageModel, ColumnarCostsApiResponse } from '../models/usage';
 import { DateRange, getDateRanges, formatDateRange } from '../utils/dateUtils';
 
 const Usage: React.FC = () => {
   const [usageData, setUsageData] = useState<UsageModel | null>(null);
-  const [projectsManager, setProjectsManager] = useState<ProjectsManager | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedDateRange, setSelectedDateRange] = useState<DateRange | null>(null);
@@ -31,24 +29,16 @@ const Usage: React.FC = () => {
     try {
       setLoading(true);
       
-      // First, fetch projects
-      console.log('Fetching projects...');
-      const projectsResponse = await api.get<ProjectsResponse>('/projects');
-      const projectsManager = new ProjectsManager(projectsResponse.data.data);
-      setProjectsManager(projectsManager);
-      
-      // Then, fetch usage data
+      // Fetch usage data, project names are added by the server
       console.log('Fetching usage data...');
-      const daysDiff = Math.ceil((selectedDateRange.endTime - selectedDateRange.startTime) / (24 * 60 * 60));
-      const limit = Math.max(daysDiff, 31); // At least 31 days, maximum selected range
-      
-      const usageResponse = await api.get<CostsApiResponse>('/costs', {
+      const usageResponse = await api.get<ColumnarCostsApiResponse>('/costs', {
         params: {
           start_time: selectedDateRange.startTime,
           end_time: selectedDateRange.endTime,
           group_by: 'project_id',
-          limit: limit,
-          bucket_width: '1d'
+          bucket_width: '1d',
+          include_project_names: true,
+          format: 'columnar'
         }
       });
 
@@ -226,18 +216,16 @@ const Usage: React.FC = () => {
                   // Get unique models used in this project
                   const projectModels = Object.keys(project.models_used);
                   
-                  // Get project name from projects manager
-                  const projectName = projectsManager?.getProjectName(project.project_id) || project.project_id;
+                  // Project name is resolved by the server
+                  const projectName = project.project_name || project.project_id;
 
                   return (
                     <tr key={project.project_id}>
                       <td>
                         <div>
                           <strong>{projectName}</strong>
-                          {projectsManager?.getProject(project.project_id)?.description && (
-                            <div className="text-muted small">
-                              {projectsManager.getProject(project.project_id)?.description}
-                            </div>
+                          {project.project_archived && (
+                            <Badge bg="secondary" className="ms-2">Archived</Badge>
                           )}
                         </div>
                       </td>
@@ -10,6 +10,8 @@ export interface Result {
   object: string;
   organization_id: string;
   project_id: string;
+  project_name?: string | null; // Only with include_project_names=true
+  project_archived?: boolean | null;
 }
 
 export interface Bucket {
@@ -26,6 +28,81 @@ export interface CostsApiResponse {
   object: string;
 }
 
+// Compact columnar encoding of CostsApiResponse (/costs?format=columnar).
+// Repeated strings are stored once in tables; every result is one row of the
+// parallel arrays in `columns`, holding indexes into `buckets` and `tables`.
+export interface ColumnarCostsApiResponse {
+  object: string;
+  format: 'columnar';
+  version: number;
+  has_more: boolean;
+  next_page: string | null;
+  objects: { bucket: string; result: string };
+  buckets: { start_time: number[]; end_time: number[] };
+  tables: {
+    project_id: (string | null)[];
+    line_item: (string | null)[];
+    organization_id: (string | null)[];
+    currency: (string | null)[];
+    project_name?: (string | null)[];
+    project_archived?: (boolean | null)[];
+  };
+  columns: {
+    bucket: number[];
+    project: number[];
+    line_item: number[];
+    amount: number[];
+    organization?: number[]; // Omitted when there is a single organization
+    currency?: number[]; // Omitted when there is a single currency
+  };
+}
+
+export function isColumnarCosts(
+  data: CostsApiResponse | ColumnarCostsApiResponse
+): data is ColumnarCostsApiResponse {
+  return (data as ColumnarCostsApiResponse).format === 'columnar';
+}
+
+// Decode the columnar format back into the regular API response structure
+export function decodeColumnarCosts(data: ColumnarCostsApiResponse): CostsApiResponse {
+  const { buckets, tables, columns, objects } = data;
+
+  const decoded: Bucket[] = buckets.start_time.map((startTime, i) => ({
+    start_time: startTime,
+    end_time: buckets.end_time[i],
+    object: objects.bucket,
+    results: [],
+  }));
+
+  for (let row = 0; row < columns.amount.length; row++) {
+    const project = columns.project[row];
+    const result: Result = {
+      amount: {
+        currency: tables.currency[columns.currency ? columns.currency[row] : 0] as string,
+        value: columns.amount[row],
+      },
+      line_item: tables.line_item[columns.line_item[row]],
+      object: objects.result,
+      organization_id: tables.organization_id[
+        columns.organization ? columns.organization[row] : 0
+      ] as string,
+      project_id: tables.project_id[project] as string,
+    };
+    if (tables.project_name) {
+      result.project_name = tables.project_name[project];
+      result.project_archived = tables.project_archived ? tables.project_archived[project] : null;
+    }
+    decoded[columns.bucket[row]].results.push(result);
+  }
+
+  return {
+    data: decoded,
+    has_more: data.has_more,
+    next_page: data.next_page,
+    object: data.object,
+  };
+}
+
 // --- Data Processing Models (for easier consumption in components) ---
 
 export interface DailyProjectCost {
@@ -37,6 +114,8 @@ export interface DailyProjectCost {
 
 export interface AggregatedProjectUsage {
   project_id: string;
+  project_name: string | null;
+  project_archived: boolean | null;
   total_cost: number;
   daily_costs: DailyProjectCost[];
   models_used: { [key: string]: number }; // Aggregated usage by model for this project
@@ -48,7 +127,10 @@ export class Usage {
   private totalOverallCost: number;
   private overallModelUsage: { [key: string]: number };
 
-  constructor(data: CostsApiResponse) {
+  constructor(data: CostsApiResponse | ColumnarCostsApiResponse) {
+    if (isColumnarCosts(data)) {
+      data = decodeColumnarCosts(data);
+    }
     this.rawData = data;
     this.aggregatedData = this.processRawData(data);
     this.totalOverallCost = this.calculateTotalOverallCost();
@@ -69,6 +151,8 @@ export class Usage {
         if (!projectMap.has(projectId)) {
           projectMap.set(projectId, {
             project_id: projectId,
+            project_name: result.project_name ?? null,
+            project_archived: result.project_archived ?? null,
             total_cost: 0,
             daily_costs: [],
             models_used: {},
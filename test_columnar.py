@@ -0,0 +1,154 @@
+"""
+Tests of the columnar /costs encoding, decoded like decodeColumnarCosts in
+src/models/usage.ts
+"""
+
+import copy
+import json
+
+from columnar import encode_costs_columnar
+
+
+def decode_columnar_costs(data):
+    """Python mirror of decodeColumnarCosts (src/models/usage.ts)"""
+    buckets, tables, columns, objects = (
+        data["buckets"], data["tables"], data["columns"], data["objects"]
+    )
+    decoded = [
+        {
+            "start_time": start_time,
+            "end_time": buckets["end_time"][i],
+            "object": objects["bucket"],
+            "results": [],
+        }
+        for i, start_time in enumerate(buckets["start_time"])
+    ]
+    for row, amount in enumerate(columns["amount"]):
+        project = columns["project"][row]
+        currency = columns["currency"][row] if "currency" in columns else 0
+        organization = columns["organization"][row] if "organization" in columns else 0
+        result = {
+            "amount": {"currency": tables["currency"][currency], "value": amount},
+            "line_item": tables["line_item"][columns["line_item"][row]],
+            "object": objects["result"],
+            "organization_id": tables["organization_id"][organization],
+            "project_id": tables["project_id"][project],
+        }
+        if "project_name" in tables:
+            result["project_name"] = tables["project_name"][project]
+            archived = tables.get("project_archived")
+            result["project_archived"] = archived[project] if archived else None
+        decoded[columns["bucket"][row]]["results"].append(result)
+    return {
+        "data": decoded,
+        "has_more": data["has_more"],
+        "next_page": data["next_page"],
+        "object": data["object"],
+    }
+
+
+def result(project_id, line_item, value, organization_id="org-a", currency="usd"):
+    return {
+        "object": "organization.costs.result",
+        "amount": {"value": value, "currency": currency},
+        "line_item": line_item,
+        "project_id": project_id,
+        "organization_id": organization_id,
+    }
+
+
+def costs_response(buckets, has_more=False, next_page=None):
+    return {
+        "object": "page",
+        "data": [
+            {
+                "object": "bucket",
+                "start_time": 1752192000 + i * 86400,
+                "end_time": 1752192000 + (i + 1) * 86400,
+                "results": results,
+            }
+            for i, results in enumerate(buckets)
+        ],
+        "has_more": has_more,
+        "next_page": next_page,
+    }
+
+
+def enrich(costs_data, names):
+    for bucket in costs_data["data"]:
+        for item in bucket["results"]:
+            if item["project_id"] in names:
+                item["project_name"], item["project_archived"] = names[item["project_id"]]
+    return costs_data
+
+
+def round_trip(costs_data):
+    encoded = encode_costs_columnar(copy.deepcopy(costs_data))
+    # The response goes through JSON on its way to the browser
+    return encoded, decode_columnar_costs(json.loads(json.dumps(encoded)))
+
+
+def test_enriched_response_round_trips():
+    costs_data = enrich(
+        costs_response(
+            [
+                [result("p1", "gpt-4o, input", 1.25), result("p2", "gpt-4o, output", 0.5)],
+                [result("p1", "o3, input", 2.0), result("p3", "gpt-4o, input", 0.001)],
+                [result("p2", "gpt-4o, input", 3.5)],
+            ],
+            has_more=True,
+            next_page="page_2",
+        ),
+        {"p1": ("Alpha", False), "p2": ("Beta", True), "p3": ("Gamma", False)},
+    )
+
+    encoded, decoded = round_trip(costs_data)
+
+    assert decoded == costs_data
+    assert encoded["tables"]["project_id"] == ["p1", "p2", "p3"]
+    assert encoded["tables"]["project_name"] == ["Alpha", "Beta", "Gamma"]
+    assert "organization" not in encoded["columns"]
+    assert "currency" not in encoded["columns"]
+
+
+def test_projects_missing_from_the_index_decode_without_name():
+    costs_data = enrich(
+        costs_response([[result("p1", "o3, input", 1.0), result("gone", "o3, input", 2.0)]]),
+        {"p1": ("Alpha", False)},
+    )
+
+    _, decoded = round_trip(costs_data)
+
+    missing = decoded["data"][0]["results"][1]
+    assert missing["project_name"] is None and missing["project_archived"] is None
+    assert decoded["data"][0]["results"][0] == costs_data["data"][0]["results"][0]
+
+
+def test_multiple_organizations_and_currencies_round_trip():
+    costs_data = costs_response(
+        [
+            [
+                result("p1", "o3, input", 1.0, organization_id="org-a", currency="usd"),
+                result("p1", "o3, input", 2.0, organization_id="org-b", currency="eur"),
+                result("p2", "o3, output", 3.0, organization_id="org-a", currency="eur"),
+            ]
+        ]
+    )
+
+    encoded, decoded = round_trip(costs_data)
+
+    assert decoded == costs_data
+    assert encoded["columns"]["organization"] == [0, 1, 0]
+    assert encoded["columns"]["currency"] == [0, 1, 1]
+
+
+def test_empty_buckets_round_trip():
+    costs_data = costs_response([[], [result("p1", "o3, input", 1.0)], []])
+
+    encoded, decoded = round_trip(costs_data)
+
+    assert decoded == costs_data
+    assert encoded["columns"]["bucket"] == [1]
+
+    _, decoded = round_trip(costs_response([[], []]))
+    assert [bucket["results"] for bucket in decoded["data"]] == [[], []]
@@ -0,0 +1,49 @@
+"""
+Tests of the Prometheus text exposition of the metrics
+"""
+
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def render(*metrics):
+    registry = Registry()
+    for metric in metrics:
+        registry.register(metric)
+    return registry.render().splitlines()
+
+
+def test_counter_renders_escaped_labels():
+    counter = Counter("requests_total", "Requests", ("route",))
+    counter.inc(route='/a"b')
+    counter.inc(2, route='/a"b')
+
+    assert render(counter) == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 5):
+        histogram.observe(value, route="/x")
+
+    assert render(histogram)[2:] == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 2',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 5.65',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_gauge_tracks_inprogress_and_functions():
+    in_flight = Gauge("in_flight", "In flight", ("endpoint",))
+    entries = Gauge("entries", "Entries")
+    entries.set_function(lambda: 7)
+
+    with in_flight.track_inprogress(endpoint="costs"):
+        assert 'in_flight{endpoint="costs"} 1' in render(in_flight)
+    assert 'in_flight{endpoint="costs"} 0' in render(in_flight)
+    assert render(entries)[2:] == ["entries 7"]
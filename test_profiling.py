@@ -0,0 +1,36 @@
+"""
+Tests of the request profiler settings
+"""
+
+import pytest
+
+from profiling import RequestProfiler
+
+
+@pytest.mark.parametrize(
+    "settings, message",
+    [
+        ({"enabled": "false"}, "enabled"),
+        ({"sample_rate": "abc"}, "sample_rate"),
+        ({"sample_rate": 2}, "sample_rate"),
+        ({"capacity": 0}, "capacity"),
+        ({"mode": "tracing"}, "mode"),
+        ({"routes": "/api/costs"}, "routes"),
+    ],
+)
+def test_invalid_settings_are_rejected(settings, message):
+    profiler = RequestProfiler()
+
+    with pytest.raises(ValueError, match=message):
+        profiler.configure(**settings)
+    assert profiler.settings()["enabled"] is False
+
+
+def test_valid_settings_are_applied():
+    profiler = RequestProfiler()
+
+    profiler.configure(enabled=True, sample_rate=1, routes=["/api/costs"], capacity=5)
+
+    assert profiler.should_profile("/api/costs")
+    assert not profiler.should_profile("/api/projects")
+    assert profiler.settings()["capacity"] == 5
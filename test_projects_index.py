@@ -0,0 +1,154 @@
+"""
+Tests of the projects index merge and refresh logic against a fake upstream
+"""
+
+import threading
+import time
+
+import pytest
+
+from projects_index import ProjectsIndex, ProjectsFetchError
+
+
+class FakeProjects:
+    """Paginated projects list like /v1/organization/projects"""
+
+    def __init__(self, count):
+        self.projects = [
+            {"id": f"p{i:03d}", "name": f"Project {i:03d}", "status": "active"}
+            for i in range(count)
+        ]
+        self.calls = 0
+        self.error = None
+
+    def fetch_page(self, after, limit):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        ids = [p["id"] for p in self.projects]
+        start = ids.index(after) + 1 if after in ids else 0
+        data = [dict(p) for p in self.projects[start : start + limit]]
+        return {
+            "object": "list",
+            "data": data,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": start + limit < len(self.projects),
+        }
+
+
+def make_index(upstream, **kwargs):
+    index = ProjectsIndex(upstream.fetch_page, page_size=100, **kwargs)
+    index.sync()
+    return index
+
+
+def ids(index):
+    return [p["id"] for p in index.list(include_archived=True)]
+
+
+def test_refresh_inserts_new_projects_at_head():
+    upstream = FakeProjects(250)
+    index = make_index(upstream)
+    upstream.projects.insert(0, {"id": "new", "name": "New", "status": "active"})
+
+    index.refresh()
+
+    assert ids(index) == [p["id"] for p in upstream.projects]
+    assert index.search("new")[0]["id"] == "new"
+
+
+def test_refresh_appends_new_projects_at_tail():
+    upstream = FakeProjects(250)
+    index = make_index(upstream)
+    upstream.projects.extend(
+        {"id": f"q{i}", "name": f"Tail {i}", "status": "active"} for i in range(150)
+    )
+
+    index.refresh()
+
+    assert ids(index) == [p["id"] for p in upstream.projects]
+
+
+def test_change_in_the_middle_is_picked_up_by_full_sync():
+    upstream = FakeProjects(250)
+    index = make_index(upstream, full_sync_interval=3600)
+    upstream.projects[150] = dict(upstream.projects[150], status="archived")
+
+    # The head scan stops at the first unchanged page
+    index.refresh()
+    assert index.get("p150")["status"] == "active"
+
+    index._last_full_sync -= 3600
+    index.ensure_fresh()
+    assert index.get("p150")["status"] == "archived"
+    assert "p150" not in [p["id"] for p in index.list()]
+
+
+def test_merge_places_new_project_after_its_predecessor():
+    upstream = FakeProjects(5)
+    index = make_index(upstream)
+
+    page = [index.get("p002"), {"id": "x", "name": "X"}, index.get("p003")]
+    changes = index._merge(page, after="p001")
+
+    assert changes == 1
+    assert ids(index) == ["p000", "p001", "p002", "x", "p003", "p004"]
+
+
+def test_failed_refresh_backs_off():
+    upstream = FakeProjects(10)
+    index = make_index(upstream, refresh_interval=0, retry_backoff=60)
+    upstream.error = ProjectsFetchError(429, "Rate limit reached")
+    calls = upstream.calls
+
+    assert index.ensure_fresh() is False
+    assert index.ensure_fresh() is True
+    assert upstream.calls == calls + 1
+    assert len(ids(index)) == 10
+
+
+def test_refresh_does_not_block_once_synced():
+    upstream = FakeProjects(10)
+    index = make_index(upstream, refresh_interval=0)
+    release = threading.Event()
+    fetch_page = upstream.fetch_page
+
+    def slow_fetch_page(after, limit):
+        release.wait(5)
+        return fetch_page(after, limit)
+
+    index._fetch_page = slow_fetch_page
+    worker = threading.Thread(target=index.ensure_fresh)
+    worker.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    assert index.ensure_fresh() is True
+    assert time.perf_counter() - start < 1
+    release.set()
+    worker.join()
+
+
+def test_first_sync_failure_is_raised_and_not_retried_immediately():
+    upstream = FakeProjects(10)
+    upstream.error = ProjectsFetchError(429, "Rate limit reached")
+    index = ProjectsIndex(upstream.fetch_page, retry_backoff=60)
+
+    for _ in range(3):
+        with pytest.raises(ProjectsFetchError):
+            index.ensure_fresh()
+    assert upstream.calls == 1
+
+
+def test_ensure_known_refreshes_for_unknown_ids_after_sync():
+    upstream = FakeProjects(10)
+    index = make_index(upstream)
+    upstream.projects.insert(0, {"id": "new", "name": "New", "status": "active"})
+
+    # Throttled right after the sync
+    index.ensure_known(["new"])
+    assert index.get("new") is None
+
+    index._last_attempt -= 120
+    index.ensure_known(["new"])
+    assert index.get("new")["name"] == "New"
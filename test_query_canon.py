@@ -0,0 +1,44 @@
+"""
+Tests of the canonical /costs query layer
+"""
+
+from werkzeug.datastructures import MultiDict
+
+from query_canon import (
+    canonicalize_costs_query,
+    generate_cache_key,
+    raw_query_fingerprint,
+)
+
+NOW = 1760870000
+
+
+def test_equivalent_queries_share_one_cache_key():
+    first = MultiDict(
+        [("start_time", "1760000123"), ("end_time", "1760800000"),
+         ("group_by", "project_id"), ("limit", "7")]
+    )
+    second = MultiDict(
+        [("start_time", "1760000999"), ("end_time", "1760800001"),
+         ("group_by", "project_id"), ("group_by", "project_id"),
+         ("limit", "31"), ("format", "columnar")]
+    )
+
+    params = canonicalize_costs_query(first, now=NOW)
+
+    assert params == canonicalize_costs_query(second, now=NOW)
+    assert params["start_time"] % 86400 == 0 and params["end_time"] % 86400 == 0
+    assert params["limit"] == (params["end_time"] - params["start_time"]) // 86400
+    assert generate_cache_key("/costs", params) == generate_cache_key(
+        "/costs", canonicalize_costs_query(second, now=NOW)
+    )
+
+
+def test_raw_fingerprint_accepts_multidict_and_dict_of_lists():
+    multidict = MultiDict([("group_by", "a"), ("group_by", "b"), ("start_time", "1")])
+    dict_of_lists = {"group_by": ["a", "b"], "start_time": ["1"]}
+
+    assert raw_query_fingerprint(multidict) == raw_query_fingerprint(dict_of_lists)
+    assert raw_query_fingerprint(dict_of_lists) != raw_query_fingerprint(
+        {"group_by": ["b", "a"], "start_time": ["2"]}
+    )
@@ -0,0 +1,64 @@
+"""
+Tests of the rolling spend statistics and anomaly detection
+"""
+
+from spend_stats import SpendTracker, SECONDS_PER_DAY
+
+
+def daily_costs(values, project_id="proj_a", first_day=0):
+    return {
+        "data": [
+            {
+                "start_time": day * SECONDS_PER_DAY,
+                "end_time": (day + 1) * SECONDS_PER_DAY,
+                "results": [
+                    {"amount": {"value": value, "currency": "usd"}, "project_id": project_id}
+                ],
+            }
+            for day, value in enumerate(values, first_day)
+        ]
+    }
+
+
+def test_spike_is_reported_as_anomaly():
+    tracker = SpendTracker(window=14)
+    tracker.ingest(daily_costs([10.0 + day % 3 for day in range(29)] + [100.0]))
+
+    anomalies = tracker.anomalies(min_history=3)
+
+    assert [a["key"] for a in anomalies] == ["proj_a"]
+    assert set(anomalies[0]["reasons"]) == {"zscore", "day_over_day"}
+
+
+def test_min_history_counts_buckets_beyond_the_window():
+    tracker = SpendTracker(window=14)
+    tracker.ingest(daily_costs([10.0 + day % 3 for day in range(29)] + [100.0]))
+
+    assert tracker.anomalies(min_history=15)
+    assert tracker.anomalies(min_history=29)
+    assert not tracker.anomalies(min_history=30)
+
+
+def test_spike_followed_by_missing_rows_is_not_current():
+    tracker = SpendTracker(window=14)
+    tracker.ingest(daily_costs([10.0 + day % 3 for day in range(20)] + [100.0]))
+    assert tracker.anomalies()
+
+    # Project a has no rows for 30 days while project b keeps spending
+    tracker.ingest(daily_costs([5.0] * 30, project_id="proj_b", first_day=21))
+
+    assert tracker.anomalies() == []
+    stats = {s["key"]: s for s in tracker.stats()}
+    assert stats["proj_a"]["latest"] == 0.0
+    assert stats["proj_a"]["bucket_start_time"] == 50 * SECONDS_PER_DAY
+
+
+def test_project_filter_does_not_zero_other_projects():
+    tracker = SpendTracker(window=14)
+    tracker.ingest(daily_costs([10.0] * 5))
+    tracker.ingest(
+        daily_costs([5.0], project_id="proj_b", first_day=5), project_ids=["proj_b"]
+    )
+
+    stats = {s["key"]: s for s in tracker.stats()}
+    assert stats["proj_a"]["latest"] == 10.0